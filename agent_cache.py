@@ -0,0 +1,140 @@
+"""
+PACCS Agent Result Cache
+Memoises agent results so unchanged films are not re-analysed
+- Keyed by a hash of the film fields each agent reads (CACHE_FIELDS),
+  the agent's other inputs and a fingerprint of its configuration
+- Size-bounded LRU eviction
+- Optional persistence to a pickle file between runs
+"""
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict
+
+
+def _digest(value):
+    """Stable hash of a JSON-like value"""
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+def config_fingerprint(agent):
+    """Hash of an agent's CACHE_VERSION and CACHE_CONFIG attributes
+    
+    Attributes that are themselves cacheable agents contribute their own
+    fingerprint, as do objects carrying a precomputed `fingerprint` (such
+    as the shared AgentRules). The result is memoised on the agent; anything
+    that swaps an agent's plain tables must reset agent._cache_fingerprint
+    to None.
+    """
+    fingerprint = getattr(agent, '_cache_fingerprint', None)
+    if fingerprint is not None:
+        return fingerprint
+    
+    config = {"version": agent.CACHE_VERSION}
+    nested = False
+    for name in agent.CACHE_CONFIG:
+        value = getattr(agent, name)
+        if hasattr(value, 'CACHE_VERSION'):
+            config[name] = config_fingerprint(value)
+            nested = True
+        elif hasattr(value, 'fingerprint'):
+            config[name] = value.fingerprint
+            nested = True
+        else:
+            config[name] = value
+    fingerprint = _digest([type(agent).__name__, config])
+    # A fingerprint built from other fingerprints is rebuilt each time so
+    # that it follows agents and rules that change underneath it
+    if not nested:
+        agent._cache_fingerprint = fingerprint
+    return fingerprint
+
+
+class AgentCache:
+    """LRU cache of agent results shared by several agents"""
+    
+    def __init__(self, max_entries=4096, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        # key -> pickled result; pickling hands every caller its own copy
+        self._entries = OrderedDict()
+        if path:
+            self.load()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def key(self, agent, film, *inputs):
+        """Cache key for an agent call on a film with extra inputs"""
+        fields = {field: film.get(field) for field in agent.CACHE_FIELDS}
+        return _digest([config_fingerprint(agent), fields, inputs])
+    
+    def get(self, key):
+        """Cached result for key, or None"""
+        blob = self._entries.get(key)
+        if blob is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return pickle.loads(blob)
+    
+    def put(self, key, result):
+        """Store a result, evicting the least recently used beyond max_entries"""
+        self._entries[key] = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop every cached result"""
+        self._entries.clear()
+    
+    def load(self):
+        """Load persisted entries (a missing or unreadable file is ignored)"""
+        try:
+            with open(self.path, 'rb') as f:
+                entries = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError) as e:
+            print(f"Could not load agent cache {self.path}: {e}")
+            return
+        self._entries = OrderedDict(entries)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def save(self):
+        """Persist the cache atomically"""
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(list(self._entries.items()), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+    
+    def stats(self):
+        """Hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0
+        }
+
+
+def cached_call(cache, agent, film, inputs, compute):
+    """Return compute() through cache (which may be None)"""
+    if cache is None:
+        return compute()
+    key = cache.key(agent, film, *inputs)
+    result = cache.get(key)
+    if result is None:
+        result = compute()
+        cache.put(key, result)
+    return result
@@ -5,25 +5,171 @@ PACCS Ultimate Intelligent Agents
 - Revenue estimation
 - Festival and distributor matching
 """
+import hashlib
 import random
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import ItemsView, KeysView, ValuesView
 from datetime import datetime
+from itertools import chain
 
-class QualityAssessmentAgent:
+import numpy as np
+
+from agent_cache import cached_call
+from rules import get_rules
+
+def _render_quality_reasoning(result, factors):
+    """Reasoning text for a quality result"""
+    parts = [f"Quality analysis for '{factors['title']}': "]
+    if result.get('strengths'):
+        parts.append(f"Strengths: {', '.join(result['strengths'])}. ")
+    if result.get('improvements'):
+        parts.append(f"Areas for growth: {', '.join(result['improvements'])}. ")
+    return "".join(parts)
+
+
+def _render_market_reasoning(result, factors):
+    """Reasoning text for a market result"""
+    parts = [f"Market analysis for '{factors['title']}': ",
+             f"{factors['genre']} content is currently {result['genre_trend']}. "]
+    if result.get('distributor_matches'):
+        parts.append(f"Top distributor match: {result['distributor_matches'][0]['name']}. ")
+    parts.append(f"Target: {', '.join(result['target_audiences'])}.")
+    return "".join(parts)
+
+
+REASONING_TEMPLATES = {
+    "quality": _render_quality_reasoning,
+    "market": _render_market_reasoning,
+}
+
+
+def render_reasoning(result):
+    """Human-readable reasoning for an agent result
+    
+    Works on AgentResults and on plain dicts (e.g. decisions loaded from
+    the decision log); results stored before reasoning became lazy keep
+    their pre-rendered text.
+    """
+    if dict.__contains__(result, 'reasoning'):
+        return result['reasoning']
+    factors = result.get('reasoning_factors')
+    if not factors:
+        return ""
+    return REASONING_TEMPLATES[factors['template']](result, factors)
+
+
+class AgentResult(dict):
+    """Agent result whose 'reasoning' text is only rendered when read
+    
+    The structured 'reasoning_factors' are stored instead of the text, so
+    bulk scoring never builds strings nobody reads. The text is cached on
+    the result once rendered.
+    
+    As a mapping (iteration, `in`, dict(), copies and json) the result
+    shows 'reasoning' in the slot of 'reasoning_factors', so decision
+    records and exports keep the text exactly as before. Pickling (the
+    agent cache) keeps the factors and stays lazy.
+    """
+    
+    __slots__ = ('_reasoning',)
+    
+    def _lazy(self):
+        """True while the reasoning text is still to be rendered from the factors"""
+        return dict.__contains__(self, 'reasoning_factors') and not dict.__contains__(self, 'reasoning')
+    
+    def __missing__(self, key):
+        if key != 'reasoning' or not dict.__contains__(self, 'reasoning_factors'):
+            raise KeyError(key)
+        try:
+            return self._reasoning
+        except AttributeError:
+            self._reasoning = render_reasoning(self)
+            return self._reasoning
+    
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def __contains__(self, key):
+        if key == 'reasoning':
+            return dict.__contains__(self, key) or dict.__contains__(self, 'reasoning_factors')
+        if key == 'reasoning_factors':
+            return False
+        return dict.__contains__(self, key)
+    
+    def __iter__(self):
+        lazy = self._lazy()
+        for key in dict.__iter__(self):
+            if key == 'reasoning_factors':
+                if lazy:
+                    yield 'reasoning'
+            else:
+                yield key
+    
+    def __len__(self):
+        return dict.__len__(self) - (dict.__contains__(self, 'reasoning_factors') and not self._lazy())
+    
+    def keys(self):
+        return KeysView(self)
+    
+    def items(self):
+        return ItemsView(self)
+    
+    def values(self):
+        return ValuesView(self)
+    
+    def copy(self):
+        """Plain dict copy with the reasoning text, like the results before lazy rendering"""
+        return dict(self)
+    
+    def __reduce__(self):
+        return type(self), (dict(dict.items(self)),)
+
+
+class RuleTablesMixin:
+    """Access to the agent rule tables (see rules.py)
+    
+    Agents read the shared, hot-reloaded rules unless they were given
+    their own AgentRules (or replaced a table with load_festivals and
+    load_distributors, which pins them to a private copy).
+    """
+    
+    _rules = None
+    
+    @property
+    def rules(self):
+        """Rule tables this agent scores with"""
+        return self._rules if self._rules is not None else get_rules()
+
+
+class QualityAssessmentAgent(RuleTablesMixin):
     """Analyzes quality with predictive intelligence"""
     
-    def __init__(self):
+    # Result caching (see agent_cache.py): bump CACHE_VERSION when the scoring code changes
+    CACHE_VERSION = 2
+    CACHE_FIELDS = ('title', 'technical_quality', 'narrative_score', 'originality_score', 'duration_minutes',
+                    'country', 'themes', 'genre', 'first_time_filmmaker', 'screenings_awards', 'synopsis')
+    CACHE_CONFIG = ('rules',)
+    
+    def __init__(self, cache=None, rules=None):
         self.name = "Quality Assessment Agent"
         self.role = "Creative Quality Evaluator"
+        self.cache = cache
         
-        self.success_indicators = {
-            "optimal_duration": {"short": (5, 20), "feature": (75, 120)},
-            "strong_countries": ["France", "Germany", "South Korea", "Japan", "Iran", "India", "USA", "UK"],
-            "trending_themes": ["Mental Health", "Climate Change", "Identity", "Social Justice", "Family"],
-            "quality_genres": ["Documentary", "Drama", "Animation"]
-        }
+        self._rules = rules
+    
+    @property
+    def success_indicators(self):
+        return self.rules.success_indicators
     
     def analyze(self, film):
         """Analyze film quality with predictive scoring"""
+        return cached_call(self.cache, self, film, (), lambda: self._analyze(film))
+    
+    def _analyze(self, film):
+        """Uncached quality analysis"""
         
         technical = film.get('technical_quality', 5.0)
         narrative = film.get('narrative_score', 5.0)
@@ -86,6 +232,14 @@ class QualityAssessmentAgent:
             confidence += 0.05
         confidence = min(0.95, confidence)
         
+        return self._build_result(film, quality_score, confidence, adjustments, datetime.now().isoformat())
+    
+    def _build_result(self, film, quality_score, confidence, adjustments, timestamp):
+        """Assemble the quality result from the computed scores"""
+        technical = film.get('technical_quality', 5.0)
+        narrative = film.get('narrative_score', 5.0)
+        originality = film.get('originality_score', 5.0)
+        
         strengths = []
         improvements = []
         
@@ -104,17 +258,11 @@ class QualityAssessmentAgent:
         elif originality < 5:
             improvements.append("Consider more unique angle")
         
-        reasoning = f"Quality analysis for '{film.get('title', 'Unknown')}': "
-        if strengths:
-            reasoning += f"Strengths: {', '.join(strengths)}. "
-        if improvements:
-            reasoning += f"Areas for growth: {', '.join(improvements)}. "
-        
-        return {
+        return AgentResult({
             "agent": self.name,
             "score": round(quality_score, 1),
             "confidence": round(confidence, 2),
-            "reasoning": reasoning,
+            "reasoning_factors": {"template": "quality", "title": film.get('title', 'Unknown')},
             "strengths": strengths,
             "improvements": improvements,
             "predictive_adjustments": adjustments,
@@ -123,63 +271,126 @@ class QualityAssessmentAgent:
                 "narrative": narrative,
                 "originality": originality
             },
-            "timestamp": datetime.now().isoformat()
-        }
+            "timestamp": timestamp
+        })
+    
+    def analyze_batch(self, films):
+        """Analyze many films at once
+        
+        The weighted sum and every adjustment run as masked array operations
+        in the same order as analyze(), so each result matches the per-film
+        path exactly (apart from the shared timestamp).
+        """
+        films = list(films)
+        if not films:
+            return []
+        indicators = self.success_indicators
+        
+        technical = np.array([film.get('technical_quality', 5.0) for film in films], dtype=np.float64)
+        narrative = np.array([film.get('narrative_score', 5.0) for film in films], dtype=np.float64)
+        originality = np.array([film.get('originality_score', 5.0) for film in films], dtype=np.float64)
+        duration = np.array([film.get('duration_minutes', 0) for film in films], dtype=np.float64)
+        
+        countries = [film.get('country', '') for film in films]
+        strong_country = np.array([any(c in country for c in indicators['strong_countries'])
+                                   for country in countries], dtype=bool)
+        matching_themes = [[t for t in film.get('themes', []) if t in indicators['trending_themes']]
+                           for film in films]
+        theme_count = np.array([len(themes) for themes in matching_themes], dtype=np.float64)
+        genres = [film.get('genre', '') for film in films]
+        quality_genre = np.array([genre in indicators['quality_genres'] for genre in genres], dtype=bool)
+        first_time = np.array([bool(film.get('first_time_filmmaker')) for film in films], dtype=bool)
+        awards = [film.get('screenings_awards', '') for film in films]
+        award_winner = np.array(['Winner' in a or 'Award' in a for a in awards], dtype=bool)
+        selection = np.array(['Official Selection' in a for a in awards], dtype=bool)
+        finalist = np.array(['Finalist' in a for a in awards], dtype=bool)
+        
+        optimal_short = (duration >= 5) & (duration <= 20)
+        optimal_feature = (duration >= 75) & (duration <= 120)
+        too_long = duration > 120
+        
+        # Adding 0.0 where a rule doesn't apply leaves the value untouched
+        quality_score = technical * 0.3 + narrative * 0.4 + originality * 0.3
+        quality_score += np.select([optimal_short, optimal_feature, too_long], [0.5, 0.5, -0.5], 0.0)
+        quality_score += np.where(strong_country, 0.3, 0.0)
+        quality_score += np.where(theme_count > 0, 0.4 * theme_count, 0.0)
+        quality_score += np.where(quality_genre, 0.3, 0.0)
+        quality_score += np.where(first_time, 0.2, 0.0)
+        quality_score += np.select([award_winner, selection, finalist], [1.5, 0.8, 0.5], 0.0)
+        quality_score = np.clip(quality_score, 1.0, 10.0)
+        
+        long_synopsis = np.array([bool(film.get('synopsis')) and len(film.get('synopsis', '')) > 100
+                                  for film in films], dtype=bool)
+        has_awards = np.array([bool(a) for a in awards], dtype=bool)
+        confidence = np.full(len(films), 0.65)
+        confidence += np.where(long_synopsis, 0.1, 0.0)
+        confidence += np.where(has_awards, 0.15, 0.0)
+        confidence += np.where(duration > 0, 0.05, 0.0)
+        confidence = np.minimum(confidence, 0.95)
+        
+        timestamp = datetime.now().isoformat()
+        results = []
+        for i, film in enumerate(films):
+            adjustments = []
+            if optimal_short[i]:
+                adjustments.append("Optimal short film duration")
+            elif optimal_feature[i]:
+                adjustments.append("Optimal feature length")
+            elif too_long[i]:
+                adjustments.append("Consider tighter edit")
+            if strong_country[i]:
+                adjustments.append(f"Strong film culture origin ({countries[i]})")
+            if matching_themes[i]:
+                adjustments.append(f"Trending themes: {', '.join(matching_themes[i])}")
+            if quality_genre[i]:
+                adjustments.append(f"Strong festival genre ({genres[i]})")
+            if first_time[i]:
+                adjustments.append("First-time filmmaker (discovery potential)")
+            if award_winner[i]:
+                adjustments.append("Award-winning track record")
+            elif selection[i]:
+                adjustments.append("Previous festival selections")
+            elif finalist[i]:
+                adjustments.append("Festival finalist history")
+            
+            results.append(self._build_result(film, float(quality_score[i]), float(confidence[i]),
+                                              adjustments, timestamp))
+        return results
 
 
-class MarketIntelligenceAgent:
+class MarketIntelligenceAgent(RuleTablesMixin):
     """Predicts commercial viability with distributor matching and revenue estimation"""
     
-    def __init__(self):
+    CACHE_VERSION = 2
+    CACHE_FIELDS = ('title', 'genre', 'genres', 'duration_minutes', 'screenings_awards', 'themes',
+                    'first_time_filmmaker')
+    CACHE_CONFIG = ('rules',)
+    
+    def __init__(self, cache=None, rules=None):
         self.name = "Market Intelligence Agent"
         self.role = "Commercial Viability & Distribution Analyst"
+        self.cache = cache
         
-        self.genre_trends = {
-            "Documentary": {"score": 0.85, "trend": "rising", "platforms": ["Netflix", "HBO", "BBC"], "avg_value": 35000},
-            "Drama": {"score": 0.75, "trend": "stable", "platforms": ["Amazon", "MUBI", "Criterion"], "avg_value": 25000},
-            "Thriller": {"score": 0.85, "trend": "rising", "platforms": ["Netflix", "Hulu", "Shudder"], "avg_value": 40000},
-            "Horror": {"score": 0.90, "trend": "hot", "platforms": ["Shudder", "AMC+", "Netflix"], "avg_value": 45000},
-            "Comedy": {"score": 0.70, "trend": "stable", "platforms": ["Amazon", "Hulu", "YouTube"], "avg_value": 20000},
-            "Sci-Fi": {"score": 0.80, "trend": "rising", "platforms": ["Netflix", "Apple TV+", "Amazon"], "avg_value": 50000},
-            "Social Impact": {"score": 0.75, "trend": "rising", "platforms": ["Netflix", "PBS", "BBC"], "avg_value": 30000},
-            "Animation": {"score": 0.85, "trend": "hot", "platforms": ["Netflix", "Disney+", "Cartoon Network"], "avg_value": 55000},
-            "Romance": {"score": 0.65, "trend": "stable", "platforms": ["Netflix", "Hallmark", "Amazon"], "avg_value": 18000},
-            "Experimental": {"score": 0.45, "trend": "niche", "platforms": ["MUBI", "Criterion", "Vimeo"], "avg_value": 8000},
-            "General": {"score": 0.60, "trend": "stable", "platforms": ["Amazon", "Vimeo", "YouTube"], "avg_value": 15000}
-        }
-        
-        self.distributors = {
-            "SHORT_FILM": [
-                {"name": "Shorts TV", "territories": ["Global"], "focus": ["All genres"], "min_score": 6.0},
-                {"name": "ShortsHD", "territories": ["USA", "Europe"], "focus": ["Drama", "Comedy"], "min_score": 6.5},
-                {"name": "Omeleto", "territories": ["Global"], "focus": ["Drama", "Documentary"], "min_score": 7.0},
-                {"name": "DUST", "territories": ["Global"], "focus": ["Sci-Fi", "Fantasy"], "min_score": 6.5},
-                {"name": "Alter", "territories": ["Global"], "focus": ["Horror", "Thriller"], "min_score": 6.0},
-            ],
-            "FEATURE": [
-                {"name": "Netflix", "territories": ["Global"], "focus": ["All genres"], "min_score": 8.0},
-                {"name": "Amazon Prime", "territories": ["Global"], "focus": ["Drama", "Documentary"], "min_score": 7.0},
-                {"name": "MUBI", "territories": ["Global"], "focus": ["Art house", "Drama"], "min_score": 7.5},
-                {"name": "Hulu", "territories": ["USA"], "focus": ["Drama", "Comedy", "Thriller"], "min_score": 7.0},
-                {"name": "Apple TV+", "territories": ["Global"], "focus": ["Drama", "Documentary"], "min_score": 8.5},
-            ],
-            "DOCUMENTARY": [
-                {"name": "Netflix Documentary", "territories": ["Global"], "focus": ["Documentary"], "min_score": 7.5},
-                {"name": "HBO Documentary Films", "territories": ["USA", "Global"], "focus": ["Documentary"], "min_score": 8.0},
-                {"name": "PBS", "territories": ["USA"], "focus": ["Documentary", "Educational"], "min_score": 6.5},
-                {"name": "BBC Storyville", "territories": ["UK", "Global"], "focus": ["Documentary"], "min_score": 7.5},
-                {"name": "Al Jazeera", "territories": ["Global"], "focus": ["Documentary", "News"], "min_score": 6.5},
-            ],
-            "BRAND_PARTNERSHIP": [
-                {"name": "Purpose Entertainment", "territories": ["Global"], "focus": ["Social Impact"], "min_score": 6.0},
-                {"name": "Participant Media", "territories": ["USA", "Global"], "focus": ["Social Impact"], "min_score": 7.0},
-                {"name": "Impact Partners", "territories": ["Global"], "focus": ["Documentary", "Social Impact"], "min_score": 7.0},
-            ]
-        }
+        self._rules = rules
+    
+    @property
+    def genre_trends(self):
+        return self.rules.genre_trends
+    
+    @property
+    def distributors(self):
+        return self.rules.distributors
+    
+    @property
+    def catalogue(self):
+        return self.rules.catalogue
+    
+    def load_distributors(self, distributors):
+        """Replace the distributor table (e.g. with a loaded buyer list)"""
+        self._rules = self.rules.replace(distributors=distributors)
     
-    def get_distributor_matches(self, film, market_score, genre):
-        """Find matching distributors"""
-        matches = []
+    def get_distributor_matches(self, film, market_score, genre, territory=None, limit=5):
+        """Find matching distributors, optionally only those covering a territory"""
         duration = film.get('duration_minutes', 0)
         
         if duration <= 40:
@@ -189,30 +400,32 @@ class MarketIntelligenceAgent:
         else:
             category = "FEATURE"
         
+        # (match_score, group, position, distributor, reason); social impact
+        # partners rank ahead of the category's distributors on ties
+        candidates = []
         themes = film.get('themes', [])
-        if any(t in ['Social Justice', 'Mental Health', 'Climate Change', 'Health'] for t in themes):
-            for dist in self.distributors.get("BRAND_PARTNERSHIP", []):
-                if market_score >= dist['min_score']:
-                    matches.append({
-                        "name": dist['name'],
-                        "match_score": min(100, int((market_score / 10) * 100) + 10),
-                        "territories": dist['territories'],
-                        "reason": "Social impact alignment"
-                    })
-        
-        for dist in self.distributors.get(category, []):
-            if market_score >= dist['min_score']:
-                if "All genres" in dist['focus'] or genre in dist['focus']:
-                    match_score = min(100, int((market_score / 10) * 100))
-                    matches.append({
-                        "name": dist['name'],
-                        "match_score": match_score,
-                        "territories": dist['territories'],
-                        "reason": f"Good fit for {genre} content"
-                    })
-        
-        matches.sort(key=lambda x: x['match_score'], reverse=True)
-        return matches[:5]
+        if any(t in self.rules.themes['brand_partnership'] for t in themes):
+            impact_score = min(100, int((market_score / 10) * 100) + 10)
+            candidates.append(
+                (impact_score, 0, position, dist, "Social impact alignment")
+                for position, dist in self.catalogue.eligible("BRAND_PARTNERSHIP", market_score, territory=territory)
+            )
+        
+        match_score = min(100, int((market_score / 10) * 100))
+        candidates.append(
+            (match_score, 1, position, dist, f"Good fit for {genre} content")
+            for position, dist in self.catalogue.eligible(category, market_score, genre=genre, territory=territory)
+        )
+        
+        return [
+            {
+                "name": dist['name'],
+                "match_score": score,
+                "territories": dist['territories'],
+                "reason": reason
+            }
+            for score, _, _, dist, reason in self.catalogue.top(chain.from_iterable(candidates), limit)
+        ]
     
     def estimate_revenue(self, film, market_score, quality_score):
         """Estimate potential revenue for the film"""
@@ -262,8 +475,45 @@ class MarketIntelligenceAgent:
             "currency": "GBP"
         }
     
+    def estimate_revenue_batch(self, films, market_scores, quality_scores):
+        """Vectorised estimate_revenue over many films"""
+        general = self.genre_trends['General']
+        base_value = np.array([self.genre_trends.get(film.get('genre', 'General'), general)['avg_value']
+                               for film in films], dtype=np.float64)
+        duration = np.array([film.get('duration_minutes', 0) for film in films], dtype=np.float64)
+        market_scores = np.asarray(market_scores, dtype=np.float64)
+        quality_scores = np.asarray(quality_scores, dtype=np.float64)
+        
+        duration_multiplier = np.select([duration <= 15, duration <= 30, duration <= 60], [0.15, 0.25, 0.5], 1.0)
+        score_multiplier = ((quality_scores + market_scores) / 2) / 7  # 7 is "average"
+        base_estimate = base_value * duration_multiplier * score_multiplier
+        
+        # Python's round() keeps the rounding identical to estimate_revenue
+        columns = zip(base_estimate.tolist(), (base_estimate * 0.6).tolist(), (base_estimate * 1.5).tolist(),
+                      (base_estimate * 0.3).tolist(), (base_estimate * 0.5).tolist(),
+                      (base_estimate * 0.15).tolist(), (base_estimate * 0.05).tolist())
+        return [
+            {
+                "total_estimate": round(total, -2),
+                "low_estimate": round(low, -2),
+                "high_estimate": round(high, -2),
+                "breakdown": {
+                    "festival_circuit": round(festival, -2),
+                    "streaming_rights": round(streaming, -2),
+                    "educational_licensing": round(educational, -2),
+                    "other": round(other, -2)
+                },
+                "currency": "GBP"
+            }
+            for total, low, high, festival, streaming, educational, other in columns
+        ]
+    
     def analyze(self, film, quality_score=None):
         """Analyze market potential with distributor matching and revenue estimation"""
+        return cached_call(self.cache, self, film, (quality_score,), lambda: self._analyze(film, quality_score))
+    
+    def _analyze(self, film, quality_score=None):
+        """Uncached market analysis"""
         
         genre = film.get('genre', 'General')
         genre_data = self.genre_trends.get(genre, self.genre_trends['General'])
@@ -292,10 +542,25 @@ class MarketIntelligenceAgent:
         q_score = quality_score if quality_score else market_score
         revenue_estimate = self.estimate_revenue(film, market_score, q_score)
         
+        confidence = 0.60
+        if film.get('screenings_awards'):
+            confidence += 0.2
+        if duration > 0:
+            confidence += 0.1
+        confidence = min(0.95, confidence)
+        
+        return self._build_result(film, genre, market_score, confidence, distributor_matches,
+                                  revenue_estimate, datetime.now().isoformat())
+    
+    def _build_result(self, film, genre, market_score, confidence, distributor_matches, revenue_estimate,
+                      timestamp):
+        """Assemble the market result from the computed scores"""
+        genre_data = self.genre_trends.get(genre, self.genre_trends['General'])
+        
         # Identify target audiences
         audiences = []
         themes = film.get('themes', [])
-        if any(t in themes for t in ["Mental Health", "Social Justice", "Health"]):
+        if any(t in self.rules.themes['social_impact_audience'] for t in themes):
             audiences.append("Social impact audiences")
         if genre in ["Documentary", "Social Impact"]:
             audiences.append("Documentary enthusiasts")
@@ -306,39 +571,88 @@ class MarketIntelligenceAgent:
         if not audiences:
             audiences.append("General audiences")
         
-        confidence = 0.60
-        if film.get('screenings_awards'):
-            confidence += 0.2
-        if duration > 0:
-            confidence += 0.1
-        confidence = min(0.95, confidence)
-        
-        reasoning = f"Market analysis for '{film.get('title', 'Unknown')}': "
-        reasoning += f"{genre} content is currently {genre_data['trend']}. "
-        if distributor_matches:
-            reasoning += f"Top distributor match: {distributor_matches[0]['name']}. "
-        reasoning += f"Target: {', '.join(audiences)}."
-        
-        return {
+        return AgentResult({
             "agent": self.name,
             "score": round(market_score, 1),
             "confidence": round(confidence, 2),
-            "reasoning": reasoning,
+            "reasoning_factors": {"template": "market", "title": film.get('title', 'Unknown'), "genre": genre},
             "target_audiences": audiences,
             "genre_trend": genre_data['trend'],
             "distributor_matches": distributor_matches,
             "recommended_platforms": genre_data['platforms'],
             "revenue_estimate": revenue_estimate,
-            "timestamp": datetime.now().isoformat()
-        }
+            "timestamp": timestamp
+        })
+    
+    def analyze_batch(self, films, quality_scores=None):
+        """Analyze many films at once
+        
+        quality_scores, if given, lines up with films (None entries fall back
+        to the market score as in analyze). Scores are computed with masked
+        array operations in analyze()'s order, so results match it exactly.
+        """
+        films = list(films)
+        if not films:
+            return []
+        general = self.genre_trends['General']
+        
+        genres = [film.get('genre', 'General') for film in films]
+        base_score = np.array([self.genre_trends.get(genre, general)['score'] for genre in genres],
+                              dtype=np.float64) * 10
+        duration = np.array([film.get('duration_minutes', 0) for film in films], dtype=np.float64)
+        awards = [film.get('screenings_awards', '') for film in films]
+        award_winner = np.array(['Winner' in a or 'Award' in a for a in awards], dtype=bool)
+        selection = np.array(['Official Selection' in a for a in awards], dtype=bool)
+        
+        short = (duration >= 5) & (duration <= 15)
+        feature = (duration >= 85) & (duration <= 110)
+        base_score += np.select([short, feature, duration > 150], [0.5, 0.5, -1.0], 0.0)
+        base_score += np.select([award_winner, selection], [1.5, 0.8], 0.0)
+        market_scores = np.clip(base_score, 1.0, 10.0).tolist()
+        
+        if quality_scores is None:
+            quality_scores = [None] * len(films)
+        q_scores = [q if q else m for q, m in zip(quality_scores, market_scores)]
+        revenue_estimates = self.estimate_revenue_batch(films, market_scores, q_scores)
+        
+        confidence = np.full(len(films), 0.60)
+        confidence += np.where(np.array([bool(a) for a in awards], dtype=bool), 0.2, 0.0)
+        confidence += np.where(duration > 0, 0.1, 0.0)
+        confidence = np.minimum(confidence, 0.95).tolist()
+        
+        timestamp = datetime.now().isoformat()
+        return [
+            self._build_result(film, genre, market_score, conf,
+                               self.get_distributor_matches(film, market_score, genre), revenue, timestamp)
+            for film, genre, market_score, conf, revenue
+            in zip(films, genres, market_scores, confidence, revenue_estimates)
+        ]
 
 
-class SuccessPredictionAgent:
+class SuccessPredictionAgent(RuleTablesMixin):
     """Predicts success probability based on historical patterns"""
     
-    def __init__(self):
+    # (minimum combined score, base %, random spread %), best band first;
+    # the last entry applies below every threshold
+    FESTIVAL_BANDS = ((8.5, 85, 10), (7.5, 65, 15), (6.5, 45, 15), (5.5, 25, 15), (None, 10, 10))
+    DISTRIBUTION_BANDS = ((8.0, 55, 15), (7.0, 35, 15), (6.0, 20, 10), (None, 5, 10))
+    AWARD_BANDS = ((9.0, 35, 15), (8.0, 18, 12), (7.0, 8, 7), (None, 2, 5))
+    
+    # Outcomes a simulation reports, with their caps
+    SIMULATED = (("festival_selection", 98), ("distribution_deal", 85), ("award_nomination", 50),
+                 ("viral_potential", 40))
+    
+    def __init__(self, rules=None):
         self.name = "Success Prediction Agent"
         self.role = "Probability Calculator"
+        self._rules = rules
+    
+    @staticmethod
+    def _band(score, bands):
+        """(base, spread) of the band a combined score falls in"""
+        for threshold, base, spread in bands:
+            if threshold is None or score >= threshold:
+                return base, spread
     
     def predict(self, film, quality_score, market_score):
         """Calculate success probabilities"""
@@ -347,16 +661,8 @@ class SuccessPredictionAgent:
         
         # Festival Selection Probability
         # Based on score ranges
-        if combined_score >= 8.5:
-            festival_prob = 85 + random.randint(0, 10)
-        elif combined_score >= 7.5:
-            festival_prob = 65 + random.randint(0, 15)
-        elif combined_score >= 6.5:
-            festival_prob = 45 + random.randint(0, 15)
-        elif combined_score >= 5.5:
-            festival_prob = 25 + random.randint(0, 15)
-        else:
-            festival_prob = 10 + random.randint(0, 10)
+        base, spread = self._band(combined_score, self.FESTIVAL_BANDS)
+        festival_prob = base + random.randint(0, spread)
         
         # Adjust for awards history
         awards = film.get('screenings_awards', '')
@@ -366,29 +672,16 @@ class SuccessPredictionAgent:
             festival_prob = min(95, festival_prob + 10)
         
         # Distribution Deal Probability
-        if combined_score >= 8.0:
-            distribution_prob = 55 + random.randint(0, 15)
-        elif combined_score >= 7.0:
-            distribution_prob = 35 + random.randint(0, 15)
-        elif combined_score >= 6.0:
-            distribution_prob = 20 + random.randint(0, 10)
-        else:
-            distribution_prob = 5 + random.randint(0, 10)
+        base, spread = self._band(combined_score, self.DISTRIBUTION_BANDS)
+        distribution_prob = base + random.randint(0, spread)
         
         # Award Nomination Probability
-        if combined_score >= 9.0:
-            award_prob = 35 + random.randint(0, 15)
-        elif combined_score >= 8.0:
-            award_prob = 18 + random.randint(0, 12)
-        elif combined_score >= 7.0:
-            award_prob = 8 + random.randint(0, 7)
-        else:
-            award_prob = 2 + random.randint(0, 5)
+        base, spread = self._band(combined_score, self.AWARD_BANDS)
+        award_prob = base + random.randint(0, spread)
         
         # Viral Potential
         themes = film.get('themes', [])
-        viral_themes = ['Mental Health', 'Social Justice', 'Climate Change']
-        if any(t in themes for t in viral_themes):
+        if any(t in self.rules.themes['viral'] for t in themes):
             viral_prob = 15 + random.randint(0, 20)
         else:
             viral_prob = 5 + random.randint(0, 10)
@@ -402,184 +695,326 @@ class SuccessPredictionAgent:
             "overall_success": min(95, int((festival_prob + distribution_prob + award_prob) / 3)),
             "timestamp": datetime.now().isoformat()
         }
+    
+    @staticmethod
+    def film_rng(film, seed):
+        """Counter-based (Philox) generator keyed by seed and film
+        
+        The same film and seed give the same draws in any process and in
+        any batch, so parallel workers reproduce each other's forecasts.
+        """
+        identity = f"{seed}:{film.get('id')}:{film.get('title')}".encode('utf-8')
+        key = int.from_bytes(hashlib.sha256(identity).digest()[:16], 'little')
+        return np.random.Generator(np.random.Philox(key=key))
+    
+    @staticmethod
+    def _band_arrays(scores, bands):
+        """Vectorised _band: (base, spread) arrays for an array of scores"""
+        conditions = [scores >= threshold for threshold, _, _ in bands[:-1]]
+        _, default_base, default_spread = bands[-1]
+        base = np.select(conditions, [b for _, b, _ in bands[:-1]], default_base)
+        spread = np.select(conditions, [s for _, _, s in bands[:-1]], default_spread)
+        return base[:, None], spread[:, None]
+    
+    @staticmethod
+    def _distribution(values, axis):
+        """Mean and 5th/50th/95th percentiles along an axis"""
+        p5, p50, p95 = np.percentile(values, [5, 50, 95], axis=axis)
+        return values.mean(axis=axis), p5, p50, p95
+    
+    def _simulate_block(self, films, quality_scores, market_scores, samples, seed):
+        """Probability samples (films x samples per outcome) and Bernoulli outcome draws"""
+        combined = (np.asarray(quality_scores, dtype=np.float64) + np.asarray(market_scores, dtype=np.float64)) / 2
+        # Per film: four rows of band noise, then four rows for the outcome draws
+        draws = np.stack([self.film_rng(film, seed).random((8, samples)) for film in films])
+        
+        def banded(bands, row):
+            # floor(u * (spread + 1)) is randint(0, spread) from a uniform draw
+            base, spread = self._band_arrays(combined, bands)
+            return base + np.floor(draws[:, row] * (spread + 1))
+        
+        awards = [film.get('screenings_awards', '') for film in films]
+        award_winner = np.array(['Winner' in a or 'Award' in a for a in awards], dtype=bool)[:, None]
+        selection = np.array(['Official Selection' in a for a in awards], dtype=bool)[:, None]
+        viral_themes = self.rules.themes['viral']
+        viral_theme = np.array([any(t in viral_themes for t in film.get('themes', [])) for film in films],
+                               dtype=bool)[:, None]
+        
+        festival = banded(self.FESTIVAL_BANDS, 0)
+        festival = np.where(award_winner, np.minimum(98, festival + 15),
+                            np.where(selection, np.minimum(95, festival + 10), festival))
+        distribution = banded(self.DISTRIBUTION_BANDS, 1)
+        award = banded(self.AWARD_BANDS, 2)
+        viral = np.where(viral_theme, 15 + np.floor(draws[:, 3] * 21), 5 + np.floor(draws[:, 3] * 11))
+        
+        uncapped = {"festival_selection": festival, "distribution_deal": distribution,
+                    "award_nomination": award, "viral_potential": viral}
+        probabilities = {}
+        outcomes = {}
+        for row, (name, cap) in enumerate(self.SIMULATED):
+            probabilities[name] = np.minimum(cap, uncapped[name])
+            outcomes[name] = draws[:, 4 + row] < probabilities[name] / 100
+        probabilities["overall_success"] = np.minimum(95, np.floor((festival + distribution + award) / 3))
+        return probabilities, outcomes
+    
+    def simulate_batch(self, films, quality_scores, market_scores, samples=2000, seed=None, block_size=256):
+        """Monte Carlo forecast for a batch of films and for the batch as a portfolio
+        
+        Each film's probabilities are drawn samples times from its score
+        bands; each sample also draws whether the outcome happens, so the
+        portfolio totals (e.g. festival selections across the batch) come
+        with confidence intervals too. Films are simulated block_size at a
+        time to bound memory.
+        """
+        films = list(films)
+        quality_scores = list(quality_scores)
+        market_scores = list(market_scores)
+        if seed is None:
+            seed = random.getrandbits(64)
+        timestamp = datetime.now().isoformat()
+        
+        results = []
+        totals = {name: np.zeros(samples) for name, _ in self.SIMULATED}
+        for start in range(0, len(films), block_size):
+            end = start + block_size
+            probabilities, outcomes = self._simulate_block(
+                films[start:end], quality_scores[start:end], market_scores[start:end], samples, seed)
+            
+            summaries = {name: [column.tolist() for column in self._distribution(values, axis=1)]
+                         for name, values in probabilities.items()}
+            rates = {name: (hits.mean(axis=1) * 100).tolist() for name, hits in outcomes.items()}
+            for name, hits in outcomes.items():
+                totals[name] += hits.sum(axis=0)
+            
+            for i in range(len(films[start:end])):
+                result = {"agent": self.name, "samples": samples, "seed": seed}
+                for name, (mean, p5, p50, p95) in summaries.items():
+                    result[name] = {
+                        "mean": round(mean[i], 1),
+                        "p5": round(p5[i], 1),
+                        "p50": round(p50[i], 1),
+                        "p95": round(p95[i], 1)
+                    }
+                    if name in rates:
+                        result[name]["outcome_rate"] = round(rates[name][i], 1)
+                result["timestamp"] = timestamp
+                results.append(result)
+        
+        portfolio = {"films": len(films), "samples": samples, "seed": seed}
+        for name, total in totals.items():
+            mean, p5, p50, p95 = (float(v) for v in self._distribution(total, axis=0))
+            portfolio[name] = {"mean": round(mean, 1), "p5": round(p5, 1), "p50": round(p50, 1),
+                               "p95": round(p95, 1)}
+        return {"films": results, "portfolio": portfolio, "timestamp": timestamp}
+    
+    def simulate(self, film, quality_score, market_score, samples=10000, seed=None):
+        """Monte Carlo forecast for one film"""
+        return self.simulate_batch([film], [quality_score], [market_score], samples=samples, seed=seed)['films'][0]
 
 
 class ComparisonEngine:
-    """Compares films against database for percentile rankings"""
+    """Compares films against the processed population for percentile rankings
     
-    def __init__(self):
+    Keeps a sorted list of combined scores for every segment (all films,
+    genre, duration category, country, first-time/experienced filmmaker),
+    so a percentile is one bisect. Segments with fewer than min_population
+    films fall back to the prior score distribution.
+    """
+    
+    def __init__(self, min_population=20):
         self.name = "Comparison Engine"
-        # Simulated distribution of scores (bell curve centered around 6.0)
+        self.min_population = min_population
+        # Prior distribution of scores (bell curve centered around 6.0)
         self.score_distribution = {
             9.5: 99, 9.0: 97, 8.5: 93, 8.0: 87,
             7.5: 78, 7.0: 67, 6.5: 54, 6.0: 42,
             5.5: 30, 5.0: 20, 4.5: 12, 4.0: 6
         }
+        self._thresholds = sorted(self.score_distribution)
+        self._threshold_percentiles = [self.score_distribution[t] for t in self._thresholds]
+        
+        self._segments = {}  # segment key -> sorted combined scores
+        self._entries = {}   # film_id -> (combined score, segment keys)
     
     def get_percentile(self, score):
-        """Get percentile for a given score"""
-        for threshold, percentile in sorted(self.score_distribution.items(), reverse=True):
-            if score >= threshold:
-                return percentile
-        return 3
+        """Get the prior percentile for a given score"""
+        i = bisect_right(self._thresholds, score) - 1
+        return self._threshold_percentiles[i] if i >= 0 else 3
     
-    def compare(self, film, quality_score, market_score):
-        """Compare film against database"""
-        
-        combined_score = (quality_score + market_score) / 2
-        genre = film.get('genre', 'General')
-        country = film.get('country', 'Unknown')
-        duration = film.get('duration_minutes', 0)
-        
-        # Overall percentile
-        overall_percentile = self.get_percentile(combined_score)
-        
-        # Genre percentile (slightly adjusted)
-        genre_percentile = min(99, self.get_percentile(combined_score) + random.randint(-5, 10))
-        
-        # Duration category percentile
+    @staticmethod
+    def duration_category(duration):
+        """Duration segment a film is compared within"""
         if duration <= 20:
-            duration_category = "short films (under 20 min)"
+            return "short films (under 20 min)"
         elif duration <= 60:
-            duration_category = "medium-length films (20-60 min)"
-        else:
-            duration_category = "feature films (60+ min)"
-        duration_percentile = min(99, self.get_percentile(combined_score) + random.randint(-8, 8))
+            return "medium-length films (20-60 min)"
+        return "feature films (60+ min)"
+    
+    @staticmethod
+    def filmmaker_type(film):
+        """Filmmaker segment a film is compared within"""
+        if film.get('first_time_filmmaker'):
+            return "first-time filmmaker submissions"
+        return "experienced filmmaker submissions"
+    
+    @staticmethod
+    def genre_and_country(film):
+        """Genre and country segments, with blanks (a CSV without a country) filled in"""
+        return film.get('genre') or 'General', film.get('country') or 'Unknown'
+    
+    def _segment_keys(self, film):
+        """Every segment a film belongs to"""
+        genre, country = self.genre_and_country(film)
+        keys = [
+            ("all",),
+            ("genre", genre),
+            ("duration", self.duration_category(film.get('duration_minutes', 0) or 0)),
+            ("country", country),
+        ]
+        # Decisions saved before the flag was recorded don't say either way
+        if 'first_time_filmmaker' in film:
+            keys.append(("filmmaker", self.filmmaker_type(film)))
+        return keys
+    
+    def add(self, film_id, film, quality_score, market_score):
+        """Add (or replace) a film's combined score in the index"""
+        self.remove(film_id)
+        combined_score = (quality_score + market_score) / 2
+        keys = self._segment_keys(film)
+        for key in keys:
+            insort(self._segments.setdefault(key, []), combined_score)
+        if film_id is not None:
+            self._entries[film_id] = (combined_score, keys)
+    
+    def add_decision(self, decision):
+        """Add a film from a consensus decision record"""
+        film_data = decision.get('film_data') or {}
+        genre, country = self.genre_and_country(film_data)
+        film = {
+            'genre': genre,
+            'country': country,
+            'duration_minutes': film_data.get('duration') or 0,
+        }
+        if 'first_time_filmmaker' in film_data:
+            film['first_time_filmmaker'] = film_data['first_time_filmmaker']
+        self.add(decision.get('film_id'), film,
+                 decision['quality_assessment']['score'], decision['market_assessment']['score'])
+    
+    def remove(self, film_id):
+        """Drop a film from the index; returns False if it wasn't there"""
+        entry = self._entries.pop(film_id, None) if film_id is not None else None
+        if entry is None:
+            return False
+        combined_score, keys = entry
+        for key in keys:
+            scores = self._segments[key]
+            del scores[bisect_left(scores, combined_score)]
+            if not scores:
+                del self._segments[key]
+        return True
+    
+    def population(self, key=("all",)):
+        """Number of films in a segment"""
+        return len(self._segments.get(key, ()))
+    
+    def segment_percentile(self, key, score):
+        """Share of a segment scoring strictly below score (prior if too few films)"""
+        scores = self._segments.get(key, ())
+        if len(scores) < self.min_population:
+            return self.get_percentile(score)
+        return min(99, bisect_left(scores, score) * 100 // len(scores))
+    
+    def compare(self, film, quality_score, market_score):
+        """Compare film against the processed population"""
         
-        # Country percentile
-        country_percentile = min(99, self.get_percentile(combined_score) + random.randint(-5, 12))
+        combined_score = (quality_score + market_score) / 2
+        genre, country = self.genre_and_country(film)
+        duration_category = self.duration_category(film.get('duration_minutes', 0) or 0)
+        filmmaker_type = self.filmmaker_type(film)
         
-        # First-time filmmaker comparison
-        if film.get('first_time_filmmaker'):
-            filmmaker_type = "first-time filmmaker submissions"
-            filmmaker_percentile = min(99, self.get_percentile(combined_score) + 10)
-        else:
-            filmmaker_type = "experienced filmmaker submissions"
-            filmmaker_percentile = min(99, self.get_percentile(combined_score))
+        overall_percentile = self.segment_percentile(("all",), combined_score)
+        genre_percentile = self.segment_percentile(("genre", genre), combined_score)
+        duration_percentile = self.segment_percentile(("duration", duration_category), combined_score)
+        country_percentile = self.segment_percentile(("country", country), combined_score)
+        filmmaker_percentile = self.segment_percentile(("filmmaker", filmmaker_type), combined_score)
         
         return {
             "engine": self.name,
             "overall": {
                 "percentile": overall_percentile,
+                "population": self.population(("all",)),
                 "description": f"Scores higher than {overall_percentile}% of all films"
             },
             "by_genre": {
                 "genre": genre,
                 "percentile": genre_percentile,
+                "population": self.population(("genre", genre)),
                 "description": f"Scores higher than {genre_percentile}% of {genre} films"
             },
             "by_duration": {
                 "category": duration_category,
                 "percentile": duration_percentile,
+                "population": self.population(("duration", duration_category)),
                 "description": f"Scores higher than {duration_percentile}% of {duration_category}"
             },
             "by_country": {
                 "country": country,
                 "percentile": country_percentile,
+                "population": self.population(("country", country)),
                 "description": f"Scores higher than {country_percentile}% of films from {country}"
             },
             "by_filmmaker": {
                 "type": filmmaker_type,
                 "percentile": filmmaker_percentile,
+                "population": self.population(("filmmaker", filmmaker_type)),
                 "description": f"Scores higher than {filmmaker_percentile}% of {filmmaker_type}"
             },
             "timestamp": datetime.now().isoformat()
         }
 
 
-class FestivalMatchingAgent:
+class FestivalMatchingAgent(RuleTablesMixin):
     """Matches films to optimal festivals worldwide"""
     
-    def __init__(self):
+    CACHE_VERSION = 1
+    CACHE_FIELDS = ('duration_minutes', 'genre', 'genres', 'themes')
+    CACHE_CONFIG = ('rules',)
+    
+    def __init__(self, cache=None, rules=None):
         self.name = "Festival Matching Agent"
         self.role = "Festival Strategy Specialist"
+        self.cache = cache
         
-        self.festivals = [
-            # Tier 1
-            {"name": "Sundance Film Festival", "country": "USA", "tier": 1, "genres": ["Drama", "Documentary", "Indie"], "duration_pref": "feature", "min_score": 8.5, "prestige": 10},
-            {"name": "Cannes Film Festival", "country": "France", "tier": 1, "genres": ["Drama", "Art House"], "duration_pref": "feature", "min_score": 9.0, "prestige": 10},
-            {"name": "Berlin International Film Festival", "country": "Germany", "tier": 1, "genres": ["Drama", "Documentary", "Political"], "duration_pref": "feature", "min_score": 8.5, "prestige": 10},
-            {"name": "Venice Film Festival", "country": "Italy", "tier": 1, "genres": ["Drama", "Art House"], "duration_pref": "feature", "min_score": 8.5, "prestige": 10},
-            {"name": "Toronto International Film Festival", "country": "Canada", "tier": 1, "genres": ["All"], "duration_pref": "feature", "min_score": 8.0, "prestige": 9},
-            
-            # Tier 2
-            {"name": "Tribeca Film Festival", "country": "USA", "tier": 2, "genres": ["Drama", "Documentary", "Indie"], "duration_pref": "both", "min_score": 7.5, "prestige": 8},
-            {"name": "SXSW Film Festival", "country": "USA", "tier": 2, "genres": ["Indie", "Tech", "Documentary"], "duration_pref": "both", "min_score": 7.0, "prestige": 8},
-            {"name": "BFI London Film Festival", "country": "UK", "tier": 2, "genres": ["All"], "duration_pref": "feature", "min_score": 7.5, "prestige": 8},
-            {"name": "Busan International Film Festival", "country": "South Korea", "tier": 2, "genres": ["Asian", "Drama"], "duration_pref": "feature", "min_score": 7.0, "prestige": 8},
-            
-            # Documentary
-            {"name": "IDFA Amsterdam", "country": "Netherlands", "tier": 1, "genres": ["Documentary"], "duration_pref": "both", "min_score": 7.5, "prestige": 9},
-            {"name": "Hot Docs", "country": "Canada", "tier": 2, "genres": ["Documentary"], "duration_pref": "both", "min_score": 7.0, "prestige": 8},
-            {"name": "Sheffield DocFest", "country": "UK", "tier": 2, "genres": ["Documentary"], "duration_pref": "both", "min_score": 6.5, "prestige": 7},
-            
-            # Shorts
-            {"name": "Clermont-Ferrand Short Film Festival", "country": "France", "tier": 1, "genres": ["All"], "duration_pref": "short", "min_score": 7.0, "prestige": 9},
-            {"name": "Palm Springs ShortFest", "country": "USA", "tier": 2, "genres": ["All"], "duration_pref": "short", "min_score": 6.5, "prestige": 8},
-            {"name": "Tampere Film Festival", "country": "Finland", "tier": 2, "genres": ["All"], "duration_pref": "short", "min_score": 6.0, "prestige": 7},
-            
-            # Genre
-            {"name": "Fantastic Fest", "country": "USA", "tier": 2, "genres": ["Horror", "Sci-Fi", "Fantasy"], "duration_pref": "both", "min_score": 6.5, "prestige": 7},
-            {"name": "Annecy Animation Festival", "country": "France", "tier": 1, "genres": ["Animation"], "duration_pref": "both", "min_score": 7.0, "prestige": 9},
-            
-            # Regional
-            {"name": "Mumbai Film Festival", "country": "India", "tier": 2, "genres": ["All"], "duration_pref": "both", "min_score": 6.0, "prestige": 7},
-            {"name": "Durban International Film Festival", "country": "South Africa", "tier": 3, "genres": ["African", "Documentary"], "duration_pref": "both", "min_score": 5.5, "prestige": 6},
-            
-            # Health/Social Impact
-            {"name": "Global Health Film Festival", "country": "UK", "tier": 3, "genres": ["Health", "Documentary", "Social Impact"], "duration_pref": "both", "min_score": 5.0, "prestige": 6},
-            {"name": "Peekaboon International Film Festival", "country": "UK", "tier": 3, "genres": ["Health", "Documentary", "Social Impact"], "duration_pref": "both", "min_score": 4.0, "prestige": 6},
-        ]
+        self._rules = rules
+    
+    @property
+    def festivals(self):
+        return self.rules.festivals
+    
+    @property
+    def festival_index(self):
+        return self.rules.festival_index
+    
+    def load_festivals(self, festivals):
+        """Replace the festival table (e.g. with a loaded festival directory)"""
+        self._rules = self.rules.replace(festivals=list(festivals))
     
     def match_festivals(self, film, quality_score):
         """Find matching festivals"""
-        matches = []
         duration = film.get('duration_minutes', 0)
         genre = film.get('genre', 'General')
         genres = film.get('genres', [genre])
         themes = film.get('themes', [])
         
         duration_type = "short" if duration <= 40 else "feature"
-        
-        for festival in self.festivals:
-            if quality_score < festival['min_score']:
-                continue
-            
-            if festival['duration_pref'] != "both" and festival['duration_pref'] != duration_type:
-                continue
-            
-            match_score = 50
-            reasons = []
-            
-            if "All" in festival['genres']:
-                match_score += 15
-                reasons.append("Open to all genres")
-            elif genre in festival['genres'] or any(g in festival['genres'] for g in genres):
-                match_score += 25
-                reasons.append(f"Genre match: {genre}")
-            elif any(t in festival['genres'] for t in themes):
-                match_score += 20
-                reasons.append("Theme alignment")
-            else:
-                continue
-            
-            match_score += int(quality_score * 3)
-            
-            if match_score >= 50:
-                matches.append({
-                    "name": festival['name'],
-                    "country": festival['country'],
-                    "tier": festival['tier'],
-                    "match_score": min(100, match_score),
-                    "prestige": festival['prestige'],
-                    "reasons": reasons
-                })
-        
-        matches.sort(key=lambda x: x['match_score'], reverse=True)
-        return matches[:10]
+        return self.festival_index.match(quality_score, duration_type, genre, genres, themes)
     
     def analyze(self, film, quality_score):
         """Generate festival strategy"""
+        return cached_call(self.cache, self, film, (quality_score,), lambda: self._analyze(film, quality_score))
+    
+    def _analyze(self, film, quality_score):
+        """Uncached festival strategy"""
         matches = self.match_festivals(film, quality_score)
         
         tier_1 = [m for m in matches if m['tier'] == 1]
@@ -607,18 +1042,102 @@ class FestivalMatchingAgent:
         }
 
 
-class OpportunityRoutingAgent:
+class FilmAnalysisContext:
+    """Per-film analysis stages, each computed at most once
+    
+    Stages are computed on first access and then shared, so agents that
+    need another stage's result read it here instead of re-running it.
+    Results already known can be passed in (e.g. quality=...).
+    """
+    
+    def __init__(self, film, quality_agent=None, market_agent=None, festival_agent=None, success_agent=None,
+                 comparison_engine=None, **results):
+        self.film = film
+        self.quality_agent = quality_agent
+        self.market_agent = market_agent
+        self.festival_agent = festival_agent
+        self.success_agent = success_agent
+        self.comparison_engine = comparison_engine
+        self._results = results
+    
+    def _stage(self, name, compute):
+        """Result of a stage, computing it the first time"""
+        if name not in self._results:
+            self._results[name] = compute()
+        return self._results[name]
+    
+    def provide(self, name, result):
+        """Record a stage result computed elsewhere (ignored if already known)"""
+        self._results.setdefault(name, result)
+    
+    def has(self, name):
+        """Whether a stage has been computed"""
+        return name in self._results
+    
+    @property
+    def quality(self):
+        return self._stage('quality', lambda: self.quality_agent.analyze(self.film))
+    
+    @property
+    def market(self):
+        return self._stage('market', lambda: self.market_agent.analyze(self.film, self.quality['score']))
+    
+    @property
+    def festival(self):
+        return self._stage('festival', lambda: self.festival_agent.analyze(self.film, self.quality['score']))
+    
+    @property
+    def success_prediction(self):
+        return self._stage('success_prediction', lambda: self.success_agent.predict(
+            self.film, self.quality['score'], self.market['score']))
+    
+    @property
+    def comparison(self):
+        return self._stage('comparison', lambda: self.comparison_engine.compare(
+            self.film, self.quality['score'], self.market['score']))
+
+
+class OpportunityRoutingAgent(RuleTablesMixin):
     """Routes films to optimal distribution pathways"""
     
-    def __init__(self):
+    CACHE_VERSION = 1
+    CACHE_FIELDS = ('themes', 'genre', 'genres', 'duration_minutes', 'screenings_awards')
+    CACHE_CONFIG = ('rules', 'festival_agent')
+    
+    def __init__(self, comparison_engine=None, cache=None, rules=None):
         self.name = "Opportunity Routing Agent"
         self.role = "Distribution Pathway Optimizer"
-        self.festival_agent = FestivalMatchingAgent()
-        self.success_agent = SuccessPredictionAgent()
-        self.comparison_engine = ComparisonEngine()
+        self.cache = cache
+        self._rules = rules
+        self.festival_agent = FestivalMatchingAgent(cache=cache, rules=rules)
+        self.success_agent = SuccessPredictionAgent(rules=rules)
+        # Pass the consensus protocol's engine so rankings see every decision
+        self.comparison_engine = comparison_engine or ComparisonEngine()
     
-    def route(self, quality_result, market_result, film):
-        """Determine optimal pathway with full analysis"""
+    def route(self, quality_result, market_result, film, context=None):
+        """Determine optimal pathway with full analysis
+        
+        Pass the film's FilmAnalysisContext to share its festival, success
+        and comparison stages with the caller instead of recomputing them.
+        """
+        if context is None:
+            context = FilmAnalysisContext(film, festival_agent=self.festival_agent, success_agent=self.success_agent,
+                                          comparison_engine=self.comparison_engine,
+                                          quality=quality_result, market=market_result)
+        inputs = (quality_result['score'], market_result['score'],
+                  market_result.get('distributor_matches', []), market_result.get('revenue_estimate', {}))
+        result = cached_call(self.cache, self, film, inputs, lambda: self._route(context))
+        # A cached route carries its own prediction; keep the context in step
+        context.provide('success_prediction', result['success_prediction'])
+        # Rankings shift as films are processed, so they never come from the cache
+        result['comparison'] = context.comparison
+        return result
+    
+    def _route(self, context):
+        """Uncached routing (without the comparison)"""
+        film = context.film
+        quality_result = context.quality
+        market_result = context.market
         
         quality_score = quality_result['score']
         market_score = market_result['score']
@@ -627,9 +1146,8 @@ class OpportunityRoutingAgent:
         duration = film.get('duration_minutes', 0)
         
         # Get all analyses
-        festival_result = self.festival_agent.analyze(film, quality_score)
-        success_prediction = self.success_agent.predict(film, quality_score, market_score)
-        comparison = self.comparison_engine.compare(film, quality_score, market_score)
+        festival_result = context.festival
+        success_prediction = context.success_prediction
         
         # Calculate pathway scores
         pathway_scores = {}
@@ -643,12 +1161,12 @@ class OpportunityRoutingAgent:
         theatrical_score = (quality_score + market_score) / 2 if quality_score >= 8.0 and market_score >= 7.5 and duration >= 70 else 0
         pathway_scores['THEATRICAL'] = theatrical_score
         
-        impact_themes = ["Social Impact", "Climate Change", "Mental Health", "Social Justice", "Health"]
-        brand_score = quality_score * 0.5 + market_score * 0.5 + 2 if any(t in themes for t in impact_themes) else 0
+        impact_themes = self.rules.themes['impact_pathway']
+        brand_score = quality_score * 0.5 + market_score * 0.5 + 2 if any(t in impact_themes for t in themes) else 0
         pathway_scores['BRAND_PARTNERSHIP'] = brand_score
         
-        edu_themes = ["History", "Nature", "Cultural Heritage", "Health", "Education"]
-        edu_score = quality_score * 0.6 + market_score * 0.4 + 1 if genre == "Documentary" or any(t in themes for t in edu_themes) else 0
+        edu_themes = self.rules.themes['educational_pathway']
+        edu_score = quality_score * 0.6 + market_score * 0.4 + 1 if genre == "Documentary" or any(t in edu_themes for t in themes) else 0
         pathway_scores['EDUCATIONAL'] = edu_score
         
         best_pathway = max(pathway_scores, key=pathway_scores.get)
@@ -687,7 +1205,7 @@ class OpportunityRoutingAgent:
             "distributor_matches": market_result.get('distributor_matches', []),
             "festival_strategy": festival_result['strategy'],
             "success_prediction": success_prediction,
-            "comparison": comparison,
+            "comparison": None,
             "revenue_estimate": market_result.get('revenue_estimate', {}),
             "timestamp": datetime.now().isoformat()
         }
@@ -734,6 +1252,10 @@ if __name__ == "__main__":
     print(f"   Distribution Deal: {sp['distribution_deal']}%")
     print(f"   Award Nomination: {sp['award_nomination']}%")
     
+    sim = routing_agent.success_agent.simulate(test_film, quality_result['score'], market_result['score'], seed=42)
+    fs = sim['festival_selection']
+    print(f"   Simulated Festival Selection: {fs['mean']}% (90% interval {fs['p5']}-{fs['p95']}%)")
+    
     print(f"\n📈 COMPARISON")
     comp = routing_result['comparison']
     print(f"   Overall: Top {100 - comp['overall']['percentile']}% (better than {comp['overall']['percentile']}%)")
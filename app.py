@@ -12,6 +12,7 @@ import re
 from datetime import datetime, timedelta
 from io import BytesIO
 import stripe
+from snapshot import load_json_cached
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'paccs-secret-key-change-in-production')
@@ -62,7 +63,10 @@ def load_json(filename, default):
 def save_json(filename, data):
     with open(filename, 'w') as f: json.dump(data, f, indent=2)
 
-def load_films(): return load_json('films_database.json', [])
+def load_films():
+    # Binary snapshot keeps worker cold starts off the JSON parser
+    try: return load_json_cached('films_database.json')
+    except: return []
 def load_users(): return load_json('paccs_users.json', {})
 def save_users(users): save_json('paccs_users.json', users)
 def load_profiles(): return load_json('paccs_profiles.json', {})
@@ -0,0 +1,210 @@
+"""
+PACCS Async Consensus
+asyncio front-end for ConsensusProtocol
+- Films are analysed on a thread pool behind a semaphore, so one event
+  loop can serve many concurrent requests without a thread each
+- External lookups run alongside the analysis; report generation and
+  persistence run concurrently once the decision is made
+- Per-film timeouts and cancellation; a film cancelled mid-analysis
+  leaves no decision and its previous ranking is restored
+"""
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from consensus import ConsensusProtocol
+
+
+class FilmCancelled(Exception):
+    """Raised inside the analysis thread when its film was cancelled"""
+
+
+def executor_lookup(func):
+    """Wrap a blocking lookup function(film) so it runs on the executor
+    
+    Use for local stand-ins of external services (a file or database
+    standing in for an API) until an async client exists.
+    """
+    func._paccs_blocking = True
+    return func
+
+
+class AsyncConsensusProtocol:
+    """Runs ConsensusProtocol analyses from asyncio code
+    
+    lookups maps a name to an async function(film) -> dict, or to a
+    blocking function wrapped with executor_lookup. Their results are
+    attached to the decision under 'lookups'; a failed lookup records its
+    error instead of failing the film.
+    """
+    
+    def __init__(self, consensus=None, max_concurrency=8, workers=None, timeout=None, lookups=None,
+                 persist=True):
+        self.consensus = consensus or ConsensusProtocol(verbose=False)
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout  # default per-film timeout in seconds (None: no limit)
+        self.lookups = dict(lookups or {})
+        self.persist = persist
+        self.executor = ThreadPoolExecutor(max_workers=workers or max_concurrency,
+                                           thread_name_prefix="paccs-consensus")
+        # The protocol's agents, cache and rankings are not thread-safe:
+        # analyses and saves take turns, everything else overlaps
+        self._lock = threading.Lock()
+        # asyncio primitives belong to one event loop, so each loop that
+        # uses the protocol (e.g. successive asyncio.run calls) gets its own
+        self._semaphores = weakref.WeakKeyDictionary()
+    
+    def _run(self, func, *args):
+        """Run a blocking call on the executor"""
+        return asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+    
+    def _analyse(self, film, cancelled):
+        """All consensus phases for one film (runs on the executor)"""
+        consensus = self.consensus
+        with self._lock:
+            if cancelled.is_set():
+                raise FilmCancelled(film.get('id'))
+            run = consensus.begin_film(film)
+            try:
+                for phase in (consensus.phase_quality, consensus.phase_market,
+                              consensus.phase_routing, consensus.phase_prediction):
+                    if cancelled.is_set():
+                        raise FilmCancelled(film.get('id'))
+                    phase(run)
+                if cancelled.is_set():
+                    raise FilmCancelled(film.get('id'))
+            except BaseException:
+                # begin_film dropped the film's old ranking; put it back
+                previous = consensus.get_decision(film.get('id'))
+                if previous is not None:
+                    try:
+                        consensus.comparison_engine.add_decision(previous)
+                    except (KeyError, TypeError):
+                        pass
+                raise
+            return consensus.finish_film(run)
+    
+    def _save(self):
+        """Append unsaved decisions to the store (runs on the executor)"""
+        with self._lock:
+            self.consensus.save_decisions(save_cache=False)
+    
+    async def _lookup(self, name, func, film):
+        """One external lookup; errors are reported, not raised"""
+        try:
+            if getattr(func, '_paccs_blocking', False):
+                return await self._run(func, film)
+            return await func(film)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+    
+    def _semaphore(self):
+        """The concurrency limit for the running event loop"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+    
+    async def _process(self, film, generate_report, cancelled):
+        async with self._semaphore():
+            names = list(self.lookups)
+            analysis = self._run(self._analyse, film, cancelled)
+            lookup_tasks = [asyncio.ensure_future(self._lookup(name, self.lookups[name], film))
+                            for name in names]
+            try:
+                decision = await analysis
+                lookup_results = await asyncio.gather(*lookup_tasks)
+            finally:
+                # A failed, cancelled or timed-out analysis abandons its lookups
+                pending = [task for task in lookup_tasks if not task.done()]
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+            if names:
+                decision['lookups'] = dict(zip(names, lookup_results))
+            
+            # The decision is final: the report and the save don't depend on each other
+            tasks = []
+            if generate_report:
+                tasks.append(self._run(self.consensus.report_generator.generate_report, film,
+                                       decision['quality_assessment'], decision['market_assessment'],
+                                       decision['routing_decision']))
+            if self.persist:
+                tasks.append(self._run(self._save))
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            if generate_report:
+                report = results[0]
+                if not isinstance(report, BaseException):
+                    decision['report'] = report
+            if self.persist and isinstance(results[-1], BaseException):
+                raise results[-1]
+            return decision
+    
+    async def process_film(self, film, generate_report=False, timeout=None):
+        """Analyse one film; raises asyncio.TimeoutError after timeout seconds
+        
+        The timeout covers waiting for a slot as well as the analysis.
+        Cancelling the awaiting task (or timing out) stops the analysis at
+        the next phase boundary without recording a decision; if the
+        decision was already made it is kept.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        cancelled = threading.Event()
+        try:
+            return await asyncio.wait_for(self._process(film, generate_report, cancelled), timeout)
+        except BaseException:
+            cancelled.set()
+            raise
+    
+    async def process_films(self, films, generate_report=False, timeout=None):
+        """Analyse films concurrently; failed or timed-out films give their exception
+        
+        Results are in input order.
+        """
+        return await asyncio.gather(
+            *(self.process_film(film, generate_report=generate_report, timeout=timeout) for film in films),
+            return_exceptions=True
+        )
+    
+    async def close(self):
+        """Save everything (including the agent cache) and stop the executor"""
+        await self._run(self._final_save)
+        self.executor.shutdown(wait=True)
+    
+    def _final_save(self):
+        with self._lock:
+            if self.persist:
+                self.consensus.save_decisions()
+            self.consensus.events.flush()
+
+
+# Test
+if __name__ == "__main__":
+    import time
+    from database import FilmDatabase
+    
+    async def demo():
+        db = FilmDatabase()
+        
+        @executor_lookup
+        def local_catalogue(film):
+            # Stand-in for an external catalogue API
+            return {"in_database": db.get_film(film['id']) is not None}
+        
+        protocol = AsyncConsensusProtocol(ConsensusProtocol(load_existing=False, verbose=False),
+                                          max_concurrency=4, timeout=30, persist=False,
+                                          lookups={"catalogue": local_catalogue})
+        start = time.time()
+        results = await protocol.process_films(db.films[:20])
+        await protocol.close()
+        done = [r for r in results if isinstance(r, dict)]
+        print(f"✅ {len(done)}/{len(results)} films analysed in {time.time() - start:.2f}s")
+        for decision in done[:3]:
+            print(f"  {decision['film_title']}: {decision['pathway']} {decision['lookups']}")
+    
+    asyncio.run(demo())
@@ -0,0 +1,185 @@
+"""
+PACCS Batch Jobs
+Checkpointed, resumable batch runs
+- Each job has a persistent id and a JSON file in paccs_jobs/
+- Films are processed in chunks; after every chunk the decisions are
+  saved, film statuses flushed and the job file rewritten atomically
+- Resuming skips films that already have a decision made with the same
+  agent configuration fingerprint, so a restart only redoes the chunk in
+  flight when it stopped
+"""
+import json
+import os
+import uuid
+from datetime import datetime
+
+JOBS_DIR = "paccs_jobs"
+CHECKPOINT_EVERY = 50  # films per checkpoint
+
+
+class BatchJob:
+    """A batch of film ids with its progress"""
+    
+    def __init__(self, film_ids, job_id=None, directory=JOBS_DIR, checkpoint_every=CHECKPOINT_EVERY):
+        self.job_id = job_id or datetime.now().strftime('%Y%m%d-%H%M%S-') + uuid.uuid4().hex[:6]
+        self.film_ids = list(film_ids)
+        self.directory = directory
+        self.checkpoint_every = checkpoint_every
+        self.status = "pending"
+        self.completed = []   # film ids processed by this job
+        self.skipped = []     # film ids that already had a current decision
+        self.failed = {}      # film id -> error message
+        self.config_fingerprint = None
+        self.created_at = datetime.now().isoformat()
+        self.updated_at = self.created_at
+    
+    @property
+    def path(self):
+        return os.path.join(self.directory, f"{self.job_id}.json")
+    
+    def done_ids(self):
+        """Film ids that need no more work"""
+        return set(self.completed) | set(self.skipped)
+    
+    def progress(self):
+        """Counts for display"""
+        total = len(self.film_ids)
+        done = len(self.done_ids())
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "total": total,
+            "completed": len(self.completed),
+            "skipped": len(self.skipped),
+            "failed": len(self.failed),
+            "remaining": total - done,
+            "percent": round(done / total * 100, 1) if total else 100.0
+        }
+    
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "film_ids": self.film_ids,
+            "completed": self.completed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "checkpoint_every": self.checkpoint_every,
+            "config_fingerprint": self.config_fingerprint,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+    
+    def save(self):
+        """Write the job file atomically"""
+        os.makedirs(self.directory, exist_ok=True)
+        self.updated_at = datetime.now().isoformat()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+    
+    @classmethod
+    def load(cls, job_id, directory=JOBS_DIR):
+        """Load a saved job"""
+        with open(os.path.join(directory, f"{job_id}.json"), 'r') as f:
+            data = json.load(f)
+        job = cls(data['film_ids'], job_id=data['job_id'], directory=directory,
+                  checkpoint_every=data.get('checkpoint_every', CHECKPOINT_EVERY))
+        job.status = data.get('status', 'pending')
+        job.completed = data.get('completed', [])
+        job.skipped = data.get('skipped', [])
+        job.failed = data.get('failed', {})
+        job.config_fingerprint = data.get('config_fingerprint')
+        job.created_at = data.get('created_at', job.created_at)
+        job.updated_at = data.get('updated_at', job.updated_at)
+        return job
+
+
+def list_jobs(directory=JOBS_DIR):
+    """Saved jobs, most recently updated first"""
+    if not os.path.isdir(directory):
+        return []
+    jobs = []
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        try:
+            jobs.append(BatchJob.load(name[:-len(".json")], directory))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not read job {name}: {e}")
+    return sorted(jobs, key=lambda job: job.updated_at, reverse=True)
+
+
+def unfinished_jobs(directory=JOBS_DIR):
+    """Saved jobs that were interrupted or are still pending"""
+    return [job for job in list_jobs(directory) if job.status in ("pending", "running")]
+
+
+def _checkpoint(job, consensus, db):
+    """Make the job's progress durable"""
+    consensus.save_decisions()
+    db.flush()
+    job.save()
+
+
+def run_job(job, consensus, db, workers=None):
+    """Run (or resume) a batch job to completion
+    
+    Films whose latest decision was made under the current agent
+    configuration are skipped; the rest are processed in chunks of
+    job.checkpoint_every with a checkpoint after each chunk.
+    """
+    fingerprint = consensus.config_fingerprint()
+    if job.config_fingerprint not in (None, fingerprint):
+        print(f"Agent configuration changed since job {job.job_id} started; "
+              f"films without a current decision will be re-processed")
+    job.config_fingerprint = fingerprint
+    job.status = "running"
+    
+    done = job.done_ids()
+    pending = []
+    for film_id in job.film_ids:
+        if film_id in done:
+            continue
+        film = db.get_film(film_id)
+        if film is None:
+            job.failed[str(film_id)] = "film not found"
+            continue
+        decision = consensus.get_decision(film_id)
+        if decision is not None and decision.get('config_fingerprint') == fingerprint:
+            # Decided before a crash but not yet checkpointed by the job
+            if film.get('status') != 'reviewed':
+                db.update_film_status(film_id, 'reviewed')
+            job.skipped.append(film_id)
+            continue
+        pending.append(film)
+    
+    job.save()
+    print(f"\n📦 Job {job.job_id}: {len(pending)} to process, {len(job.done_ids())} already done")
+    
+    try:
+        for start in range(0, len(pending), job.checkpoint_every):
+            chunk = pending[start:start + job.checkpoint_every]
+            if workers and workers > 1:
+                consensus.process_films(chunk, workers=workers)
+            else:
+                for film in chunk:
+                    consensus.process_film(film)
+            for film in chunk:
+                db.update_film_status(film['id'], 'reviewed')
+                job.completed.append(film['id'])
+            _checkpoint(job, consensus, db)
+            progress = job.progress()
+            print(f"  ✔ Checkpoint: {progress['completed'] + progress['skipped']}/{progress['total']} "
+                  f"({progress['percent']}%)")
+    except BaseException:
+        # Keep what finished; the job stays "running" so it can be resumed
+        _checkpoint(job, consensus, db)
+        raise
+    
+    job.status = "completed"
+    _checkpoint(job, consensus, db)
+    return job
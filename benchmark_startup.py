@@ -0,0 +1,91 @@
+"""
+PACCS Startup Benchmark
+Compares loading films_database.json with loading its binary snapshot
+Usage: python3 benchmark_startup.py [film_count ...]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from snapshot import load_snapshot, write_snapshot
+
+
+def make_films(count):
+    """Synthetic films shaped like a FilmFreeway import"""
+    genres = ["Drama", "Documentary", "Comedy", "Thriller", "Horror", "Animation"]
+    countries = ["UK", "USA", "India", "Japan", "France", "Germany"]
+    films = []
+    for i in range(count):
+        films.append({
+            "id": f"FILM_{i+1:04d}",
+            "tracking_number": f"TN{i:06d}",
+            "title": f"Benchmark Film {i+1}",
+            "director": "Test Director",
+            "genre": random.choice(genres),
+            "genres": random.sample(genres, 2),
+            "duration_minutes": random.randint(3, 120),
+            "country": random.choice(countries),
+            "language": "English",
+            "synopsis": "A filmmaker follows a family through a difficult year. " * 8,
+            "themes": ["Family", "Identity"],
+            "categories": "Best Short Film, Best Documentary",
+            "project_type": "Short",
+            "first_time_filmmaker": random.random() < 0.3,
+            "judging_status": "Undecided",
+            "screenings_awards": "Official Selection - Somewhere Film Festival",
+            "technical_quality": round(random.uniform(4, 9), 1),
+            "narrative_score": round(random.uniform(5, 9), 1),
+            "originality_score": round(random.uniform(4, 9), 1),
+            "market_score": round(random.uniform(4, 9), 1),
+            "status": "pending",
+            "paccs_processed": False
+        })
+    return films
+
+
+def best_of(func, repeats=5):
+    """Fastest of several runs, in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def json_load(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def run(count):
+    """Benchmark both formats for one database size"""
+    films = make_films(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "films_database.json")
+        with open(path, 'w') as f:
+            json.dump(films, f, indent=2)
+        write_snapshot(path, films)
+        
+        assert load_snapshot(path) == json_load(path)
+        
+        json_ms = best_of(lambda: json_load(path))
+        snapshot_ms = best_of(lambda: load_snapshot(path))
+        json_mb = os.path.getsize(path) / 1e6
+        snapshot_mb = os.path.getsize(path + ".snapshot") / 1e6
+    
+    print(f"{count:>8} films | JSON {json_ms:8.1f} ms ({json_mb:6.1f} MB) | "
+          f"snapshot {snapshot_ms:8.1f} ms ({snapshot_mb:6.1f} MB) | {json_ms / snapshot_ms:4.1f}x")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PACCS Startup Benchmark: JSON vs binary snapshot")
+    print("=" * 60)
+    
+    counts = [int(arg) for arg in sys.argv[1:]] or [4726, 50000]
+    for count in counts:
+        run(count)
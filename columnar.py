@@ -0,0 +1,177 @@
+"""
+PACCS Columnar Tables
+NumPy struct-of-arrays views over films and decisions
+- Numeric fields as float64 arrays, categorical fields as int32 codes
+- Amortised O(1) appends and in-place row updates
+- Vectorised summaries, histograms, counts and group-bys
+"""
+import numpy as np
+
+
+class ColumnTable:
+    """Growable columnar table built from dict records"""
+    
+    def __init__(self, numeric_fields, categorical_fields, capacity=1024):
+        # {column name: function(record) -> value}
+        self.numeric_fields = numeric_fields
+        self.categorical_fields = categorical_fields
+        self.size = 0
+        self._capacity = capacity
+        self._numeric = {name: np.zeros(capacity, dtype=np.float64) for name in numeric_fields}
+        self._codes = {name: np.zeros(capacity, dtype=np.int32) for name in categorical_fields}
+        self._categories = {name: [] for name in categorical_fields}
+        self._category_codes = {name: {} for name in categorical_fields}
+    
+    @classmethod
+    def from_records(cls, records, numeric_fields, categorical_fields):
+        """Build a table from a list of records in one pass"""
+        records = list(records)
+        table = cls(numeric_fields, categorical_fields, capacity=max(1024, len(records)))
+        for name, extract in numeric_fields.items():
+            table._numeric[name][:len(records)] = [extract(r) for r in records]
+        for name, extract in categorical_fields.items():
+            table._codes[name][:len(records)] = [table._code(name, extract(r)) for r in records]
+        table.size = len(records)
+        return table
+    
+    def __len__(self):
+        return self.size
+    
+    def _code(self, name, value):
+        """Code for a categorical value, adding the category if new"""
+        codes = self._category_codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._categories[name])
+            self._categories[name].append(value)
+        return code
+    
+    def _grow(self):
+        """Double the capacity of every column"""
+        self._capacity *= 2
+        for columns in (self._numeric, self._codes):
+            for name, array in columns.items():
+                grown = np.zeros(self._capacity, dtype=array.dtype)
+                grown[:self.size] = array[:self.size]
+                columns[name] = grown
+    
+    def append(self, record):
+        """Append a record, returning its row number"""
+        if self.size == self._capacity:
+            self._grow()
+        row = self.size
+        self.size += 1
+        self.set(row, record)
+        return row
+    
+    def set(self, row, record):
+        """Overwrite a row with a record's values"""
+        for name, extract in self.numeric_fields.items():
+            self._numeric[name][row] = extract(record)
+        for name, extract in self.categorical_fields.items():
+            self._codes[name][row] = self._code(name, extract(record))
+    
+    def set_value(self, row, name, value):
+        """Overwrite a single cell"""
+        if name in self._codes:
+            self._codes[name][row] = self._code(name, value)
+        else:
+            self._numeric[name][row] = value
+    
+    def column(self, name):
+        """Numeric column as an array view"""
+        return self._numeric[name][:self.size]
+    
+    def codes(self, name):
+        """Categorical column as an array of codes"""
+        return self._codes[name][:self.size]
+    
+    def categories(self, name):
+        """Category values, indexed by code"""
+        return self._categories[name]
+    
+    def summary(self, name):
+        """Count, mean, std, min, max and quartiles of a numeric column"""
+        values = self.column(name)
+        if not values.size:
+            return {"count": 0}
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+        return {
+            "count": int(values.size),
+            "mean": round(float(values.mean()), 2),
+            "std": round(float(values.std()), 2),
+            "min": round(float(values.min()), 2),
+            "max": round(float(values.max()), 2),
+            "p25": round(float(q1), 2),
+            "median": round(float(median), 2),
+            "p75": round(float(q3), 2)
+        }
+    
+    def histogram(self, name, bins=10, value_range=None):
+        """Histogram of a numeric column as plain lists"""
+        counts, edges = np.histogram(self.column(name), bins=bins, range=value_range)
+        return {"counts": counts.tolist(), "edges": [round(float(e), 2) for e in edges]}
+    
+    def counts(self, name):
+        """Number of rows per category"""
+        totals = np.bincount(self.codes(name), minlength=len(self._categories[name]))
+        return {value: int(n) for value, n in zip(self._categories[name], totals) if n}
+    
+    def group_sum(self, name, by):
+        """Sum of a numeric column per category"""
+        totals = np.bincount(self.codes(by), weights=self.column(name),
+                             minlength=len(self._categories[by]))
+        present = np.bincount(self.codes(by), minlength=len(self._categories[by]))
+        return {value: float(total) for value, total, n in zip(self._categories[by], totals, present) if n}
+    
+    def group_mean(self, name, by):
+        """Mean of a numeric column per category"""
+        totals = np.bincount(self.codes(by), weights=self.column(name),
+                             minlength=len(self._categories[by]))
+        present = np.bincount(self.codes(by), minlength=len(self._categories[by]))
+        return {value: round(float(total / n), 2)
+                for value, total, n in zip(self._categories[by], totals, present) if n}
+
+
+FILM_NUMERIC_FIELDS = {
+    "technical_quality": lambda f: f.get('technical_quality', 5.0),
+    "narrative_score": lambda f: f.get('narrative_score', 5.0),
+    "originality_score": lambda f: f.get('originality_score', 5.0),
+    "market_score": lambda f: f.get('market_score', 5.0),
+    "duration_minutes": lambda f: f.get('duration_minutes', 0) or 0,
+}
+
+FILM_CATEGORICAL_FIELDS = {
+    "genre": lambda f: f.get('genre', 'Unknown'),
+    "country": lambda f: f.get('country', 'Unknown'),
+    "status": lambda f: f.get('status', 'Unknown'),
+}
+
+DECISION_NUMERIC_FIELDS = {
+    "final_score": lambda d: d.get('final_score', 5),
+    "final_confidence": lambda d: d.get('final_confidence', 0.5),
+    "quality_score": lambda d: d.get('quality_assessment', {}).get('score', 0),
+    "market_score": lambda d: d.get('market_assessment', {}).get('score', 0),
+    "festival_probability": lambda d: d['success_prediction'].get('festival_selection', 50)
+                                      if d.get('success_prediction') else 0,
+    "revenue_estimate": lambda d: (d.get('revenue_estimate') or {}).get('total_estimate', 0),
+    "festival_matches": lambda d: len(d.get('festival_matches') or []),
+    "distributor_matches": lambda d: len(d.get('distributor_matches') or []),
+    "escalated": lambda d: 1.0 if d.get('needs_escalation') else 0.0,
+}
+
+DECISION_CATEGORICAL_FIELDS = {
+    "pathway": lambda d: d.get('pathway', 'Unknown'),
+    "genre": lambda d: (d.get('film_data') or {}).get('genre') or 'Unknown',
+    "country": lambda d: (d.get('film_data') or {}).get('country') or 'Unknown',
+}
+
+
+def film_columns(films=()):
+    """Columnar view over film records"""
+    return ColumnTable.from_records(films, FILM_NUMERIC_FIELDS, FILM_CATEGORICAL_FIELDS)
+
+
+def decision_columns(decisions=()):
+    """Columnar view over consensus decisions"""
+    return ColumnTable.from_records(decisions, DECISION_NUMERIC_FIELDS, DECISION_CATEGORICAL_FIELDS)
@@ -7,118 +7,252 @@ PACCS Ultimate Consensus Protocol
 - Festival and distributor matching
 - Report generation
 """
+import hashlib
 import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from agents import (
     QualityAssessmentAgent, 
     MarketIntelligenceAgent, 
     OpportunityRoutingAgent,
     SuccessPredictionAgent,
-    ComparisonEngine
+    ComparisonEngine,
+    FilmAnalysisContext
 )
 from report_generator import FilmReportGenerator
+from decision_store import DecisionStore
+from agent_cache import AgentCache, config_fingerprint
+from revenue_portfolio import RevenuePortfolio
+from event_log import EventLog
+from running_stats import DecisionStats, stats_path
+
+def ranking_message(comparison):
+    """Audit log text for a film's overall ranking"""
+    return f"Overall ranking: Top {100 - comparison['overall']['percentile']}%"
+
+
+class FilmRun:
+    """One film moving through the consensus phases
+    
+    Holds the film's analysis context (which caches every agent result),
+    its event log and the routing decision once phase 4 has run.
+    """
+    
+    __slots__ = ('film', 'context', 'log', 'routing')
+    
+    def __init__(self, film, context, log):
+        self.film = film
+        self.context = context
+        self.log = log
+        self.routing = None
+
 
 class ConsensusProtocol:
     """Ultimate consensus with all features"""
     
-    def __init__(self):
-        print("Initializing PACCS Ultimate Consensus Protocol...")
-        self.quality_agent = QualityAssessmentAgent()
-        self.market_agent = MarketIntelligenceAgent()
-        self.routing_agent = OpportunityRoutingAgent()
-        self.success_agent = SuccessPredictionAgent()
+    def __init__(self, load_existing=True, store=None, cache=None, verbose=True, log_file=None):
+        # verbose=False skips all console output (the audit trail is still
+        # kept); log_file also writes events to a file
+        self.events = EventLog(verbose=verbose, path=log_file)
+        self.events.info("Initializing PACCS Ultimate Consensus Protocol...")
+        # Agent results are memoised per film content; pass
+        # AgentCache(path=...) to keep them between runs
+        self.cache = cache if cache is not None else AgentCache()
+        self.quality_agent = QualityAssessmentAgent(cache=self.cache)
+        self.market_agent = MarketIntelligenceAgent(cache=self.cache)
         self.comparison_engine = ComparisonEngine()
+        self.routing_agent = OpportunityRoutingAgent(comparison_engine=self.comparison_engine, cache=self.cache)
+        self.success_agent = SuccessPredictionAgent()
         self.report_generator = FilmReportGenerator()
-        self.negotiation_log = []
+        self._log = self.events.film()
+        self.negotiation_log = self._log.events  # latest film's events
         self.decisions = []
+        self.store = store if store is not None else DecisionStore()
+        self._decision_positions = {}  # film_id -> index in self.decisions
+        self._unsaved = []
+        self.portfolio = RevenuePortfolio()  # latest revenue estimate per film
+        self.stats = DecisionStats()  # running aggregates for get_statistics
+        self.stats_path = stats_path(self.store.path)
+        
+        if not load_existing:
+            return
         
-        # Try to load existing decisions
+        # Aggregates saved with the log are reused if the log hasn't changed since
+        saved_stats = DecisionStats.load(self.stats_path, self.store.path)
+        if saved_stats is not None:
+            self.stats = None
+        
+        # Stream existing decisions from the append-only log
         try:
-            with open('paccs_decisions.json', 'r') as f:
-                self.decisions = json.load(f)
-                print(f"Loaded {len(self.decisions)} existing decisions")
-        except:
-            pass
+            for decision in self.store.load():
+                self._record_decision(decision, saved=True)
+            self.events.info(f"Loaded {len(self.decisions)} existing decisions")
+        except OSError as e:
+            self.events.warning(f"Could not load decisions: {e}")
+        
+        if self.stats is None:
+            if saved_stats.count == len(self.decisions):
+                self.stats = saved_stats
+            else:
+                self._rebuild_stats()
     
-    def log_event(self, event_type, message, agent=None):
-        """Log negotiation events"""
-        timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-        log_entry = {
-            'timestamp': timestamp,
-            'type': event_type,
-            'agent': agent,
-            'message': message
-        }
-        self.negotiation_log.append(log_entry)
+    def _record_decision(self, decision, saved=False):
+        """Add a decision, replacing any earlier one for the same film"""
+        film_id = decision.get('film_id')
+        position = self._decision_positions.get(film_id) if film_id is not None else None
         
-        if agent:
-            print(f"  [{timestamp}] {agent}: {message}")
+        if position is None:
+            if film_id is not None:
+                self._decision_positions[film_id] = len(self.decisions)
+            self.decisions.append(decision)
+            if self.stats is not None:
+                self.stats.add(decision)
         else:
-            print(f"  [{timestamp}] SYSTEM: {message}")
-    
-    def process_film(self, film, generate_report=False):
-        """Process a film with full analysis"""
-        self.negotiation_log = []
+            if self.stats is not None:
+                self.stats.replace(self.decisions[position], decision)
+            self.decisions[position] = decision
+        self.portfolio.add_decision(decision)
+        
+        try:
+            self.comparison_engine.add_decision(decision)
+        except (KeyError, TypeError):
+            pass  # Malformed legacy record; it just isn't ranked against
         
-        print(f"\n{'='*60}")
-        print(f"🎬 PACCS CONSENSUS: {film.get('title', 'Unknown')}")
-        print(f"{'='*60}")
+        if not saved:
+            self._unsaved.append(decision)
+    
+    def _reset_decisions(self):
+        """Forget all in-memory decisions (does not touch the store)"""
+        self.decisions = []
+        self._decision_positions = {}
+        self._unsaved = []
+        self.portfolio = RevenuePortfolio()
+        self.stats = DecisionStats()
+        self.comparison_engine = ComparisonEngine()
+        self.routing_agent.comparison_engine = self.comparison_engine
+    
+    def _rebuild_stats(self):
+        """Recompute the running aggregates from the in-memory decisions"""
+        self.stats = DecisionStats()
+        for decision in self.decisions:
+            self.stats.add(decision)
+    
+    def get_decision(self, film_id):
+        """Get the latest decision for a film"""
+        position = self._decision_positions.get(film_id)
+        return self.decisions[position] if position is not None else None
+    
+    def config_fingerprint(self):
+        """Hash of every agent's configuration (rules, tables, code version)"""
+        agents = (self.quality_agent, self.market_agent, self.routing_agent)
+        return hashlib.sha1(":".join(config_fingerprint(agent) for agent in agents).encode('utf-8')).hexdigest()
+    
+    def analysis_context(self, film):
+        """Fresh per-film analysis context wired to this protocol's agents"""
+        return FilmAnalysisContext(
+            film,
+            quality_agent=self.quality_agent,
+            market_agent=self.market_agent,
+            festival_agent=self.routing_agent.festival_agent,
+            success_agent=self.success_agent,
+            comparison_engine=self.comparison_engine
+        )
+    
+    def log_event(self, event_type, message, agent=None):
+        """Log a negotiation event to the latest film's log"""
+        return self._log.event(event_type, message, agent)
+    
+    def begin_film(self, film):
+        """Start a film's run through the phases (see FilmRun)"""
+        # A log per run, so concurrent runs keep separate audit trails
+        log = self._log = self.events.film()
+        self.negotiation_log = log.events
+        # Rank a re-processed film against the others, not its old decision
+        self.comparison_engine.remove(film.get('id'))
         
-        # Phase 1: Quality Assessment
-        self.log_event("PHASE", "Phase 1 - Quality Assessment")
-        quality_result = self.quality_agent.analyze(film)
-        self.log_event("RESULT", f"Quality: {quality_result['score']}/10", "Quality Agent")
+        if log.enabled:
+            log.info(f"\n{'='*60}\n🎬 PACCS CONSENSUS: {film.get('title', 'Unknown')}\n{'='*60}")
         
-        # Phase 2: Market Analysis
-        self.log_event("PHASE", "Phase 2 - Market Analysis & Revenue Estimation")
-        market_result = self.market_agent.analyze(film, quality_result['score'])
-        self.log_event("RESULT", f"Market: {market_result['score']}/10 (trend: {market_result.get('genre_trend', 'stable')})", "Market Agent")
+        # Every stage is computed once and shared through the context
+        return FilmRun(film, self.analysis_context(film), log)
+    
+    def phase_quality(self, run):
+        """Phase 1: quality assessment"""
+        run.log.event("PHASE", "Phase 1 - Quality Assessment")
+        quality_result = run.context.quality
+        run.log.event("RESULT", f"Quality: {quality_result['score']}/10", "Quality Agent")
+        return run
+    
+    def phase_market(self, run):
+        """Phases 2 and 3: market analysis, then negotiation with quality"""
+        log = run.log
+        log.event("PHASE", "Phase 2 - Market Analysis & Revenue Estimation")
+        market_result = run.context.market
+        log.event("RESULT", f"Market: {market_result['score']}/10 (trend: {market_result.get('genre_trend', 'stable')})", "Market Agent")
         
         if market_result.get('distributor_matches'):
-            self.log_event("MATCH", f"Top distributor: {market_result['distributor_matches'][0]['name']}", "Market Agent")
+            log.event("MATCH", f"Top distributor: {market_result['distributor_matches'][0]['name']}", "Market Agent")
         
         if market_result.get('revenue_estimate'):
             rev = market_result['revenue_estimate']
-            self.log_event("REVENUE", f"Estimated value: £{rev['low_estimate']:,} - £{rev['high_estimate']:,}", "Market Agent")
+            log.event("REVENUE", f"Estimated value: £{rev['low_estimate']:,} - £{rev['high_estimate']:,}", "Market Agent")
         
         # Phase 3: Negotiation
-        score_diff = abs(quality_result['score'] - market_result['score'])
+        score_diff = abs(run.context.quality['score'] - market_result['score'])
         if score_diff > 2.0:
-            self.log_event("PHASE", "Phase 3 - Agent Negotiation")
-            self.log_event("CONFLICT", f"Score divergence: {score_diff:.1f} points")
+            log.event("PHASE", "Phase 3 - Agent Negotiation")
+            log.event("CONFLICT", f"Score divergence: {score_diff:.1f} points")
         else:
-            self.log_event("PHASE", "Phase 3 - Agents in Agreement")
-        
-        # Phase 4: Routing & Festival Matching
-        self.log_event("PHASE", "Phase 4 - Pathway Routing & Matching")
-        routing_result = self.routing_agent.route(quality_result, market_result, film)
-        self.log_event("ROUTING", f"Pathway: {routing_result['primary_pathway']}", "Routing Agent")
+            log.event("PHASE", "Phase 3 - Agents in Agreement")
+        return run
+    
+    def phase_routing(self, run):
+        """Phase 4: pathway routing and festival matching"""
+        context = run.context
+        run.log.event("PHASE", "Phase 4 - Pathway Routing & Matching")
+        routing_result = run.routing = self.routing_agent.route(context.quality, context.market, run.film, context=context)
+        run.log.event("ROUTING", f"Pathway: {routing_result['primary_pathway']}", "Routing Agent")
         
         if routing_result.get('festival_matches'):
-            self.log_event("MATCH", f"Top festival: {routing_result['festival_matches'][0]['name']}", "Routing Agent")
+            run.log.event("MATCH", f"Top festival: {routing_result['festival_matches'][0]['name']}", "Routing Agent")
+        return run
+    
+    def phase_prediction(self, run):
+        """Phase 5: success prediction, then the population comparison"""
+        run.log.event("PHASE", "Phase 5 - Success Prediction")
+        success_prediction = run.context.success_prediction
+        run.log.event("PREDICTION", f"Festival selection: {success_prediction['festival_selection']}%", "Prediction Agent")
         
-        # Phase 5: Success Prediction
-        self.log_event("PHASE", "Phase 5 - Success Prediction")
-        success_prediction = routing_result.get('success_prediction', 
-            self.success_agent.predict(film, quality_result['score'], market_result['score']))
-        self.log_event("PREDICTION", f"Festival selection: {success_prediction['festival_selection']}%", "Prediction Agent")
+        comparison = run.context.comparison
+        run.log.event("COMPARE", ranking_message(comparison), "Comparison Engine")
+        return run
+    
+    def finish_film(self, run, generate_report=False, record=True):
+        """Phase 6: final consensus and the decision record
         
-        # Phase 6: Comparison
-        comparison = routing_result.get('comparison',
-            self.comparison_engine.compare(film, quality_result['score'], market_result['score']))
-        self.log_event("COMPARE", f"Overall ranking: Top {100 - comparison['overall']['percentile']}%", "Comparison Engine")
+        With record=False the decision is not kept in self.decisions (the
+        streaming pipeline hands it to a sink instead) but later films are
+        still ranked against it.
+        """
+        film, context, log = run.film, run.context, run.log
+        quality_result = context.quality
+        market_result = context.market
+        routing_result = run.routing
+        success_prediction = context.success_prediction
+        comparison = context.comparison
         
-        # Final Consensus
-        self.log_event("PHASE", "Phase 6 - Final Consensus")
+        log.event("PHASE", "Phase 6 - Final Consensus")
         
         final_score = (quality_result['score'] + market_result['score']) / 2
         final_confidence = min(quality_result['confidence'], market_result['confidence'], routing_result['confidence'])
         needs_escalation = final_confidence < 0.6
         
         if needs_escalation:
-            self.log_event("ESCALATION", "Low confidence - flagging for human review")
+            log.event("ESCALATION", "Low confidence - flagging for human review")
         else:
-            self.log_event("CONSENSUS", f"CONSENSUS REACHED: {routing_result['primary_pathway']}")
+            log.event("CONSENSUS", f"CONSENSUS REACHED: {routing_result['primary_pathway']}")
         
         # Build decision record
         decision = {
@@ -129,7 +263,8 @@ class ConsensusProtocol:
                 'country': film.get('country'),
                 'duration': film.get('duration_minutes'),
                 'genre': film.get('genre'),
-                'themes': film.get('themes', [])
+                'themes': film.get('themes', []),
+                'first_time_filmmaker': bool(film.get('first_time_filmmaker'))
             },
             'quality_assessment': quality_result,
             'market_assessment': market_result,
@@ -144,7 +279,8 @@ class ConsensusProtocol:
             'distributor_matches': market_result.get('distributor_matches', [])[:5],
             'next_steps': routing_result.get('next_steps', []),
             'needs_escalation': needs_escalation,
-            'audit_log': self.negotiation_log.copy(),
+            'audit_log': log.audit_log(),
+            'config_fingerprint': self.config_fingerprint(),
             'processed_at': datetime.now().isoformat()
         }
         
@@ -158,23 +294,114 @@ class ConsensusProtocol:
             except:
                 pass
         
-        self.decisions.append(decision)
+        if record:
+            self._record_decision(decision)
+        else:
+            try:
+                self.comparison_engine.add_decision(decision)
+            except (KeyError, TypeError):
+                pass
         
-        # Print summary
-        print(f"\n{'='*60}")
-        print(f"✅ DECISION: {routing_result['primary_pathway']}")
-        print(f"📊 Score: {final_score:.1f}/10 | Confidence: {int(final_confidence*100)}%")
-        print(f"🎯 Festival Selection Probability: {success_prediction['festival_selection']}%")
-        print(f"📈 Ranking: Top {100 - comparison['overall']['percentile']}% overall")
-        if market_result.get('revenue_estimate'):
-            rev = market_result['revenue_estimate']
-            print(f"💰 Estimated Value: £{rev['low_estimate']:,} - £{rev['high_estimate']:,}")
-        print(f"{'='*60}")
+        # Summary
+        if log.enabled:
+            lines = [
+                f"\n{'='*60}",
+                f"✅ DECISION: {routing_result['primary_pathway']}",
+                f"📊 Score: {final_score:.1f}/10 | Confidence: {int(final_confidence*100)}%",
+                f"🎯 Festival Selection Probability: {success_prediction['festival_selection']}%",
+                f"📈 Ranking: Top {100 - comparison['overall']['percentile']}% overall"
+            ]
+            if market_result.get('revenue_estimate'):
+                rev = market_result['revenue_estimate']
+                lines.append(f"💰 Estimated Value: £{rev['low_estimate']:,} - £{rev['high_estimate']:,}")
+            lines.append('='*60)
+            log.info("\n".join(lines))
         
         return decision
     
-    def save_decisions(self, filename="paccs_decisions.json"):
-        """Save decisions to file"""
+    def process_film(self, film, generate_report=False):
+        """Process a film with full analysis"""
+        run = self.begin_film(film)
+        self.phase_quality(run)
+        self.phase_market(run)
+        self.phase_routing(run)
+        self.phase_prediction(run)
+        return self.finish_film(run, generate_report=generate_report)
+    
+    def process_films(self, films, workers=None, generate_report=False, chunksize=None):
+        """Process a batch of films across a process pool
+        
+        Decisions come back in submission order and are merged into
+        self.decisions; nothing is written to disk until save_decisions().
+        """
+        films = list(films)
+        if not films:
+            return []
+        
+        workers = workers or os.cpu_count() or 1
+        workers = min(workers, len(films))
+        
+        if workers <= 1:
+            return [self.process_film(film, generate_report=generate_report) for film in films]
+        
+        if chunksize is None:
+            # A few chunks per worker keeps the pool busy without paying
+            # pickling overhead for every single film
+            chunksize = max(1, len(films) // (workers * 4))
+        
+        self.events.info(f"\n⚙️  Processing {len(films)} films across {workers} workers...")
+        jobs = [(film, generate_report) for film in films]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            decisions = list(executor.map(_process_in_worker, jobs, chunksize=chunksize))
+        
+        for film, decision in zip(films, decisions):
+            # Workers only see their own films, so rank against the whole
+            # population here, in submission order as process_film would
+            self.comparison_engine.remove(film.get('id'))
+            comparison = self.comparison_engine.compare(
+                film, decision['quality_assessment']['score'], decision['market_assessment']['score'])
+            decision['comparison'] = comparison
+            decision['routing_decision']['comparison'] = comparison
+            self._rewrite_ranking_event(decision, comparison)
+            self._record_decision(decision)
+            if self.events.enabled:
+                self.events.info(f"  ✅ {decision['film_title']}: {decision['pathway']} "
+                                 f"({decision['final_score']}/10, top {100 - comparison['overall']['percentile']}%)")
+        return decisions
+    
+    def _rewrite_ranking_event(self, decision, comparison):
+        """Point a worker's COMPARE audit entry at the parent's ranking"""
+        audit_log = decision.setdefault('audit_log', [])
+        for entry in reversed(audit_log):
+            if entry.get('type') == "COMPARE":
+                entry['message'] = ranking_message(comparison)
+                return
+        audit_log.append({
+            'timestamp': self.events.clock(),
+            'type': "COMPARE",
+            'agent': "Comparison Engine",
+            'message': ranking_message(comparison)
+        })
+    
+    def save_decisions(self, save_cache=True):
+        """Append decisions made since the last save to the decision log
+        
+        save_cache=False skips rewriting the agent cache file, for callers
+        that save after every film.
+        """
+        if not self._unsaved:
+            return
+        
+        self.store.append_many(self._unsaved)
+        self.events.info(f"\n💾 Saved {len(self._unsaved)} decisions to {self.store.path}")
+        self._unsaved = []
+        # Every decision is on disk now, so the aggregates describe the log
+        self.stats.save(self.stats_path, self.store.path)
+        if save_cache:
+            self.cache.save()
+    
+    def export_decisions(self, filename="paccs_decisions.json"):
+        """Export all decisions as a single JSON array"""
         decisions_to_save = []
         for d in self.decisions:
             d_copy = d.copy()
@@ -183,51 +410,27 @@ class ConsensusProtocol:
         
         with open(filename, 'w') as f:
             json.dump(decisions_to_save, f, indent=2)
-        print(f"\n💾 Decisions saved to {filename}")
+        self.events.info(f"\n💾 Decisions exported to {filename}")
     
     def get_statistics(self):
-        """Get comprehensive statistics"""
+        """Get comprehensive statistics (from the running aggregates and the revenue portfolio)"""
         if not self.decisions:
             return {"total": 0}
         
-        pathways = {}
-        festivals_matched = 0
-        distributors_matched = 0
-        escalations = 0
-        total_confidence = 0
-        total_score = 0
-        total_festival_prob = 0
-        total_revenue = 0
-        
-        for d in self.decisions:
-            p = d['pathway']
-            pathways[p] = pathways.get(p, 0) + 1
-            
-            if d.get('festival_matches'):
-                festivals_matched += len(d['festival_matches'])
-            if d.get('distributor_matches'):
-                distributors_matched += len(d['distributor_matches'])
-            if d.get('needs_escalation'):
-                escalations += 1
-            
-            total_confidence += d.get('final_confidence', 0.5)
-            total_score += d.get('final_score', 5)
-            
-            if d.get('success_prediction'):
-                total_festival_prob += d['success_prediction'].get('festival_selection', 50)
-            
-            if d.get('revenue_estimate'):
-                total_revenue += d['revenue_estimate'].get('total_estimate', 0)
-        
-        count = len(self.decisions)
+        stats = self.stats
+        count = stats.count
+        festivals_matched = int(round(stats.total('festival_matches')))
+        distributors_matched = int(round(stats.total('distributor_matches')))
+        escalations = int(round(stats.total('escalated')))
         
         return {
             'total_processed': count,
-            'pathways': pathways,
-            'avg_score': round(total_score / count, 2),
-            'avg_confidence': round(total_confidence / count, 2),
-            'avg_festival_probability': round(total_festival_prob / count, 1),
-            'total_estimated_value': total_revenue,
+            'pathways': stats.counts('pathway'),
+            'avg_score': round(stats.mean('final_score'), 2),
+            'score_std': round(stats.std('final_score'), 2),
+            'avg_confidence': round(stats.mean('final_confidence'), 2),
+            'avg_festival_probability': round(stats.mean('festival_probability'), 1),
+            'total_estimated_value': int(round(self.portfolio.total())),
             'escalations': escalations,
             'escalation_rate': round(escalations / count * 100, 1),
             'total_festival_matches': festivals_matched,
@@ -237,6 +440,29 @@ class ConsensusProtocol:
         }
 
 
+# Per-process protocol used by process_films workers
+_worker_consensus = None
+
+
+def _init_worker():
+    """Set up a worker process for process_films"""
+    global _worker_consensus
+    # Forked workers inherit the parent's random state; reseed so the
+    # agents' variance differs between processes
+    random.seed()
+    # Workers stay quiet; the parent reports each decision as it merges
+    _worker_consensus = ConsensusProtocol(load_existing=False, verbose=False)
+
+
+def _process_in_worker(job):
+    """Run the full agent pipeline for one film inside a worker"""
+    film, generate_report = job
+    decision = _worker_consensus.process_film(film, generate_report=generate_report)
+    # The worker's protocol is throwaway; don't let its history grow
+    _worker_consensus._reset_decisions()
+    return decision
+
+
 # Test
 if __name__ == "__main__":
     from database import FilmDatabase
@@ -268,4 +494,9 @@ if __name__ == "__main__":
     print(f"Festival matches: {stats['total_festival_matches']}")
     print(f"Distributor matches: {stats['total_distributor_matches']}")
     
+    valuation = consensus.portfolio.valuation()
+    print(f"Portfolio value: £{valuation['low_estimate']:,.0f} - £{valuation['high_estimate']:,.0f}")
+    for channel, value in valuation['by_channel'].items():
+        print(f"  {channel}: £{value:,.0f}")
+    
     print("\n✅ Ultimate consensus test complete!")
\ No newline at end of file
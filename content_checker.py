@@ -4,6 +4,7 @@ Ensures all submitted content meets platform standards
 """
 import re
 from datetime import datetime
+from theme_tagger import KeywordTagger
 
 
 class ContentChecker:
@@ -34,6 +35,10 @@ class ContentChecker:
         
         # Required fields
         self.required_fields = ['title', 'duration', 'country', 'genre']
+        
+        # Single-pass, word-boundary matchers over the term lists
+        self.offensive_matcher = KeywordTagger({term: [term] for term in self.offensive_terms})
+        self.copyright_matcher = KeywordTagger({flag: [flag] for flag in self.copyright_flags})
     
     def check_film(self, film_data):
         """
@@ -118,12 +123,10 @@ class ContentChecker:
         """Check text for offensive content"""
         issues = []
         warnings = []
-        text_lower = text.lower()
         
         # Check offensive terms
-        for term in self.offensive_terms:
-            if term in text_lower:
-                issues.append(f"{field_name} contains potentially offensive content: '{term}'")
+        for term in self.offensive_matcher.tag(text):
+            issues.append(f"{field_name} contains potentially offensive content: '{term}'")
         
         # Check for excessive caps (shouting)
         caps_ratio = sum(1 for c in text if c.isupper()) / max(len(text), 1)
@@ -144,11 +147,10 @@ class ContentChecker:
             str(film_data.get('title', '')),
             str(film_data.get('synopsis', '')),
             str(film_data.get('themes', ''))
-        ]).lower()
+        ])
         
-        for flag in self.copyright_flags:
-            if flag in text_to_check:
-                warnings.append(f"Potential copyright concern: content mentions '{flag}'")
+        for flag in self.copyright_matcher.tag(text_to_check):
+            warnings.append(f"Potential copyright concern: content mentions '{flag}'")
         
         return warnings
     
@@ -202,11 +204,10 @@ class ContentChecker:
     
     def quick_check(self, title, synopsis=""):
         """Quick check for real-time validation"""
-        text = f"{title} {synopsis}".lower()
+        text = f"{title} {synopsis}"
         
-        for term in self.offensive_terms:
-            if term in text:
-                return {'valid': False, 'reason': 'Contains inappropriate content'}
+        if self.offensive_matcher.match(text):
+            return {'valid': False, 'reason': 'Contains inappropriate content'}
         
         if len(title.strip()) < 2:
             return {'valid': False, 'reason': 'Title too short'}
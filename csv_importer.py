@@ -0,0 +1,252 @@
+"""
+PACCS FilmFreeway Importer
+Streaming, resumable import of FilmFreeway CSV exports
+- Reads the export in fixed-size chunks
+- Checkpoints after every chunk so an interrupted import resumes
+- Upserts only rows whose Tracking Number is new or whose content changed
+- Keeps ids, PACCS status and random-derived scores of known films
+"""
+import csv
+import io
+import json
+import mmap
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from database import FilmDatabase
+
+
+# Fields a re-import must never overwrite on a film we already know
+PRESERVED_FIELDS = ('id', 'status', 'paccs_processed', 'narrative_score', 'originality_score')
+
+
+class FilmFreewayImporter:
+    """Streams a FilmFreeway CSV export into a FilmDatabase"""
+    
+    def __init__(self, db, csv_file=None, chunk_size=500, checkpoint_file=None):
+        self.db = db
+        self.csv_file = csv_file or db.csv_file
+        self.chunk_size = chunk_size
+        self.checkpoint_file = checkpoint_file or f"{self.csv_file}.import-checkpoint.json"
+    
+    def _source_identity(self):
+        """Identify the export file so a checkpoint is only reused for the same file"""
+        stat = os.stat(self.csv_file)
+        return {"csv_file": os.path.abspath(self.csv_file), "size": stat.st_size, "mtime": stat.st_mtime}
+    
+    def load_checkpoint(self):
+        """Return the saved checkpoint if it belongs to the current export"""
+        try:
+            with open(self.checkpoint_file, 'r') as f:
+                checkpoint = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if checkpoint.get('source') != self._source_identity():
+            return None
+        return checkpoint
+    
+    def save_checkpoint(self, rows_done, counts):
+        """Record progress atomically"""
+        checkpoint = {"source": self._source_identity(), "rows_done": rows_done, "counts": counts}
+        tmp_file = self.checkpoint_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_file, self.checkpoint_file)
+    
+    def clear_checkpoint(self):
+        """Remove the checkpoint once an import completes"""
+        try:
+            os.remove(self.checkpoint_file)
+        except FileNotFoundError:
+            pass
+    
+    def _build_lookups(self):
+        """Index the existing films by tracking number and title"""
+        by_tracking = {}
+        by_title = {}
+        next_number = 1
+        for film in self.db.films:
+            if film.get('tracking_number'):
+                by_tracking[film['tracking_number'].strip()] = film
+            if film.get('title'):
+                by_title.setdefault(film['title'], film)
+            try:
+                next_number = max(next_number, int(film['id'].split('_')[-1]) + 1)
+            except ValueError:
+                pass
+        return by_tracking, by_title, next_number
+    
+    def _merge(self, existing, row):
+        """Rebuild a changed film while keeping what PACCS owns"""
+        film = self.db.build_film(row, existing['id'])
+        for field in PRESERVED_FIELDS:
+            if field in existing:
+                film[field] = existing[field]
+        if 'source_hash' not in existing:
+            # Imported before hashes were tracked: we can't tell what
+            # changed, so don't reshuffle its scores either
+            for field in ('technical_quality', 'market_score'):
+                if field in existing:
+                    film[field] = existing[field]
+        return film
+    
+    def run(self, resume=True):
+        """Import the export, returning counts of added/updated/unchanged/skipped rows"""
+        checkpoint = self.load_checkpoint() if resume else None
+        rows_done = checkpoint['rows_done'] if checkpoint else 0
+        counts = checkpoint['counts'] if checkpoint else {"added": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+        if checkpoint:
+            print(f"Resuming import of {self.csv_file} after row {rows_done}")
+        
+        by_tracking, by_title, next_number = self._build_lookups()
+        
+        with open(self.csv_file, 'r', encoding='utf-8', errors='ignore', newline='') as f:
+            reader = csv.DictReader(f)
+            # Rows before the checkpoint are parsed but not re-scored
+            for _ in islice(reader, rows_done):
+                pass
+            
+            while True:
+                chunk = list(islice(reader, self.chunk_size))
+                if not chunk:
+                    break
+                
+                changes = []
+                for row in chunk:
+                    title = row.get('Project Title', '').strip()
+                    if not title:
+                        counts['skipped'] += 1
+                        continue
+                    
+                    tracking_number = row.get('Tracking Number', '').strip()
+                    existing = by_tracking.get(tracking_number) if tracking_number else by_title.get(title)
+                    source_hash = self.db.row_hash(row)
+                    
+                    if existing is not None:
+                        if existing.get('source_hash') == source_hash:
+                            counts['unchanged'] += 1
+                            continue
+                        film = self._merge(existing, row)
+                        counts['updated'] += 1
+                    elif title in by_title:
+                        # Same title under a new tracking number: a duplicate
+                        # submission, skipped just like a fresh import does
+                        counts['skipped'] += 1
+                        continue
+                    else:
+                        film = self.db.build_film(row, f"FILM_{next_number:04d}")
+                        next_number += 1
+                        counts['added'] += 1
+                    
+                    if tracking_number:
+                        by_tracking[tracking_number] = film
+                    by_title.setdefault(title, film)
+                    changes.append(film)
+                
+                self.db.upsert_films(changes)
+                self.db.flush()
+                rows_done += len(chunk)
+                self.save_checkpoint(rows_done, counts)
+                print(f"  Processed {rows_done} rows ({counts['added']} new, {counts['updated']} updated)")
+        
+        self.clear_checkpoint()
+        return counts
+
+
+def _record_end(data, start, search_from):
+    """Offset just past the first newline at or after search_from that ends a record
+    
+    A newline only ends a record when an even number of quote characters
+    precede it since start (escaped quotes come in pairs); otherwise it
+    sits inside a quoted multi-line field such as a synopsis.
+    """
+    quotes = data[start:search_from].count(b'"')
+    pos = search_from
+    while True:
+        newline = data.find(b'\n', pos)
+        if newline == -1:
+            return len(data)
+        quotes += data[pos:newline].count(b'"')
+        if quotes % 2 == 0:
+            return newline + 1
+        pos = newline + 1
+
+
+def find_chunk_boundaries(csv_file, chunk_bytes=1 << 20):
+    """Split a CSV file into byte ranges that start and end on record boundaries
+    
+    Returns the header's fieldnames and a list of (start, end) offsets.
+    """
+    with open(csv_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return [], []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            header_end = _record_end(data, 0, 0)
+            header = data[:header_end].decode('utf-8', errors='ignore')
+            fieldnames = next(csv.reader(io.StringIO(header, newline=None)), [])
+            
+            ranges = []
+            start = header_end
+            while start < len(data):
+                end = _record_end(data, start, min(start + chunk_bytes, len(data)))
+                ranges.append((start, end))
+                start = end
+    return fieldnames, ranges
+
+
+def _seed_worker():
+    """Reseed random so forked workers don't all draw the same scores"""
+    random.seed()
+
+
+def _score_chunk(job):
+    """Parse and score the rows in one byte range of the export"""
+    csv_file, start, end, fieldnames = job
+    with open(csv_file, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8', errors='ignore')
+    
+    films = []
+    # newline=None matches the universal-newline text mode of the serial import
+    for row in csv.DictReader(io.StringIO(text, newline=None), fieldnames=fieldnames):
+        if not row.get('Project Title', '').strip():
+            continue
+        films.append(FilmDatabase.build_film(row, None))
+    return films
+
+
+def score_csv_parallel(csv_file, workers=None, chunk_bytes=None):
+    """Score every row of an export in a process pool
+    
+    Yields scored films (without ids) in file order; the caller assigns
+    ids and drops duplicate titles exactly as the serial import does.
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunk_bytes is None:
+        # A few chunks per worker balances the load across the pool
+        chunk_bytes = max(1 << 16, os.path.getsize(csv_file) // (workers * 4) + 1)
+    
+    fieldnames, ranges = find_chunk_boundaries(csv_file, chunk_bytes)
+    jobs = [(csv_file, start, end, fieldnames) for start, end in ranges]
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_seed_worker) as executor:
+        for films in executor.map(_score_chunk, jobs):
+            yield from films
+
+
+if __name__ == "__main__":
+    from database import open_database
+    
+    print("=" * 60)
+    print("PACCS FilmFreeway Import")
+    print("=" * 60)
+    
+    db = open_database(write_behind=True)
+    counts = FilmFreewayImporter(db).run()
+    
+    print(f"\nAdded: {counts['added']}")
+    print(f"Updated: {counts['updated']}")
+    print(f"Unchanged: {counts['unchanged']}")
+    print(f"Skipped: {counts['skipped']}")
@@ -2,11 +2,12 @@
 PACCS Dashboard
 Generates metrics and visualizations
 """
-import json
 import matplotlib.pyplot as plt
 import matplotlib
 matplotlib.use('Agg')
 from datetime import datetime
+from decision_store import DecisionStore
+from columnar import decision_columns
 
 class Dashboard:
     """Generates PACCS metrics dashboard"""
@@ -16,43 +17,32 @@ class Dashboard:
         self.load_decisions()
     
     def load_decisions(self):
-        """Load decisions from file"""
-        try:
-            with open('paccs_decisions.json', 'r') as f:
-                self.decisions = json.load(f)
+        """Load decisions from the decision log"""
+        self.decisions = DecisionStore().load()
+        self.columns = decision_columns(self.decisions)
+        if self.decisions:
             print(f"Loaded {len(self.decisions)} decisions")
-        except FileNotFoundError:
+        else:
             print("No decisions file found. Run consensus.py first.")
-            self.decisions = []
     
     def generate_metrics(self):
         """Calculate system metrics"""
         if not self.decisions:
             return None
         
-        pathways = {}
-        for d in self.decisions:
-            p = d['pathway']
-            pathways[p] = pathways.get(p, 0) + 1
-        
-        scores = [d['final_score'] for d in self.decisions]
-        avg_score = sum(scores) / len(scores)
-        
-        confidences = [d['final_confidence'] for d in self.decisions]
-        avg_confidence = sum(confidences) / len(confidences)
-        
-        escalations = sum(1 for d in self.decisions if d['needs_escalation'])
-        escalation_rate = escalations / len(self.decisions) * 100
+        cols = self.columns
+        scores = cols.column('final_score')
+        escalation_rate = cols.column('escalated').mean() * 100
         
         return {
             'total_processed': len(self.decisions),
-            'pathways': pathways,
-            'avg_score': round(avg_score, 2),
-            'avg_confidence': round(avg_confidence, 2),
-            'escalation_rate': round(escalation_rate, 1),
+            'pathways': cols.counts('pathway'),
+            'avg_score': round(float(scores.mean()), 2),
+            'avg_confidence': round(float(cols.column('final_confidence').mean()), 2),
+            'escalation_rate': round(float(escalation_rate), 1),
             'score_range': {
-                'min': round(min(scores), 1),
-                'max': round(max(scores), 1)
+                'min': round(float(scores.min()), 1),
+                'max': round(float(scores.max()), 1)
             }
         }
     
@@ -77,7 +67,7 @@ class Dashboard:
         
         # 2. Score Distribution (Histogram)
         ax2 = axes[0, 1]
-        scores = [d['final_score'] for d in self.decisions]
+        scores = self.columns.column('final_score')
         ax2.hist(scores, bins=10, color='#2c5282', edgecolor='white')
         ax2.axvline(metrics['avg_score'], color='#c53030', linestyle='--', 
                    label=f'Average: {metrics["avg_score"]}')
@@ -88,10 +78,10 @@ class Dashboard:
         
         # 3. Quality vs Market Scores (Scatter)
         ax3 = axes[1, 0]
-        quality_scores = [d['quality_assessment']['score'] for d in self.decisions]
-        market_scores = [d['market_assessment']['score'] for d in self.decisions]
-        colors_scatter = ['#c53030' if d['needs_escalation'] else '#2c5282' 
-                         for d in self.decisions]
+        quality_scores = self.columns.column('quality_score')
+        market_scores = self.columns.column('market_score')
+        colors_scatter = ['#c53030' if escalated else '#2c5282'
+                          for escalated in self.columns.column('escalated')]
         ax3.scatter(quality_scores, market_scores, c=colors_scatter, alpha=0.7)
         ax3.plot([0, 10], [0, 10], 'k--', alpha=0.3, label='Agreement line')
         ax3.set_xlabel('Quality Score')
@@ -2,33 +2,118 @@
 PACCS Film Database - REAL DATA VERSION
 Loads actual films from FilmFreeway export
 """
+import atexit
 import csv
+import hashlib
 import json
+import os
 import random
+import threading
 from datetime import datetime
+from columnar import film_columns
+from snapshot import load_json_cached, write_snapshot
+from theme_tagger import KeywordTagger
+
+THEME_KEYWORDS = {
+    "Mental Health": ["mental", "depression", "anxiety", "suicide", "therapy", "psychological"],
+    "Social Justice": ["justice", "equality", "rights", "discrimination", "activism"],
+    "Climate Change": ["climate", "environment", "nature", "pollution", "sustainability"],
+    "Health": ["health", "medical", "disease", "hospital", "doctor", "patient", "public health"],
+    "Family": ["family", "mother", "father", "parent", "child", "son", "daughter"],
+    "Identity": ["identity", "self", "who am i", "culture", "heritage"],
+    "Love": ["love", "romance", "relationship", "heart", "passion"],
+    "War": ["war", "soldier", "military", "conflict", "battle"],
+    "Technology": ["technology", "ai", "computer", "digital", "internet"],
+    "Education": ["education", "school", "student", "learn", "teacher"]
+}
+
+# Compiled once; shared by every FilmDatabase and import worker
+THEME_TAGGER = KeywordTagger(THEME_KEYWORDS)
 
 class FilmDatabase:
     """Manages the film database with REAL FilmFreeway data"""
     
-    def __init__(self, csv_file="FilmFreeway-Submissions-2025-11-25-09-41-21.csv", db_file="films_database.json"):
+    # Fields with a secondary index (value -> films)
+    INDEXED_FIELDS = ('status', 'genre', 'country', 'project_type')
+    
+    def __init__(self, csv_file="FilmFreeway-Submissions-2025-11-25-09-41-21.csv", db_file="films_database.json",
+                 write_behind=False, flush_interval=5.0, flush_threshold=100, import_workers=1):
         self.csv_file = csv_file
         self.db_file = db_file
+        self.import_workers = import_workers
         self.films = []
+        self._by_id = {}
+        self._indexes = {field: {} for field in self.INDEXED_FIELDS}
+        # Columnar copy of the scores, built on first use of get_score_statistics
+        self._columns = None
+        self._column_rows = {}
+        
+        # Write-behind: status changes mark films dirty and the file is
+        # rewritten once per interval/threshold instead of once per change
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._dirty = set()
+        self._lock = threading.RLock()
+        self._flush_timer = None
+        if write_behind:
+            atexit.register(self.flush)
+        
         self.load_or_create()
     
     def load_or_create(self):
         """Load from JSON cache or import from CSV"""
         try:
-            with open(self.db_file, 'r') as f:
-                self.films = json.load(f)
+            self.films = load_json_cached(self.db_file)
             print(f"Loaded {len(self.films)} films from database")
         except FileNotFoundError:
             print("Importing films from FilmFreeway CSV...")
-            self.import_from_csv()
+            self.import_from_csv(workers=self.import_workers)
             self.save()
             print(f"Database initialized with {len(self.films)} REAL films!")
+        self.rebuild_indexes()
+    
+    def rebuild_indexes(self):
+        """Rebuild the id and secondary indexes from self.films"""
+        self._by_id = {}
+        self._indexes = {field: {} for field in self.INDEXED_FIELDS}
+        for film in self.films:
+            self._index_film(film)
+        self._columns = None
     
-    def parse_duration(self, duration_str):
+    def _index_film(self, film):
+        """Add a film to every index"""
+        self._by_id[film['id']] = film
+        for field, index in self._indexes.items():
+            # Buckets are dicts used as insertion-ordered sets of film ids
+            index.setdefault(film.get(field, 'Unknown'), {})[film['id']] = film
+    
+    def _unindex_film(self, film):
+        """Remove a film from every index"""
+        self._by_id.pop(film['id'], None)
+        for field, index in self._indexes.items():
+            self._remove_from_bucket(index, film.get(field, 'Unknown'), film['id'])
+    
+    @staticmethod
+    def _remove_from_bucket(index, value, film_id):
+        """Drop a film from one index bucket, discarding the bucket once empty"""
+        bucket = index.get(value)
+        if bucket is None:
+            return
+        bucket.pop(film_id, None)
+        if not bucket:
+            del index[value]
+    
+    def _set_field(self, film, field, value):
+        """Change a field on a film, keeping its index bucket up to date"""
+        if field in self._indexes:
+            index = self._indexes[field]
+            self._remove_from_bucket(index, film.get(field, 'Unknown'), film['id'])
+            index.setdefault(value, {})[film['id']] = film
+        film[field] = value
+    
+    @staticmethod
+    def parse_duration(duration_str):
         """Convert duration string to minutes"""
         if not duration_str:
             return 0
@@ -46,7 +131,8 @@ class FilmDatabase:
             return 0
         return 0
     
-    def extract_genres(self, genre_str):
+    @staticmethod
+    def extract_genres(genre_str):
         """Extract genres from string"""
         if not genre_str:
             return ["General"]
@@ -54,31 +140,20 @@ class FilmDatabase:
         genres = [g.strip() for g in genre_str.split(',') if g.strip()]
         return genres if genres else ["General"]
     
-    def determine_themes(self, synopsis, categories):
+    @staticmethod
+    def determine_themes(synopsis, categories):
         """Determine themes from synopsis and categories"""
-        themes = []
-        text = (synopsis + " " + categories).lower()
-        
-        theme_keywords = {
-            "Mental Health": ["mental", "depression", "anxiety", "suicide", "therapy", "psychological"],
-            "Social Justice": ["justice", "equality", "rights", "discrimination", "activism"],
-            "Climate Change": ["climate", "environment", "nature", "pollution", "sustainability"],
-            "Health": ["health", "medical", "disease", "hospital", "doctor", "patient", "public health"],
-            "Family": ["family", "mother", "father", "parent", "child", "son", "daughter"],
-            "Identity": ["identity", "self", "who am i", "culture", "heritage"],
-            "Love": ["love", "romance", "relationship", "heart", "passion"],
-            "War": ["war", "soldier", "military", "conflict", "battle"],
-            "Technology": ["technology", "ai", "computer", "digital", "internet"],
-            "Education": ["education", "school", "student", "learn", "teacher"]
-        }
-        
-        for theme, keywords in theme_keywords.items():
-            if any(kw in text for kw in keywords):
-                themes.append(theme)
-        
+        themes = THEME_TAGGER.tag(synopsis + " " + categories)
         return themes if themes else ["General"]
     
-    def calculate_quality_score(self, film_data):
+    @staticmethod
+    def determine_themes_batch(texts):
+        """Determine themes for many (synopsis, categories) pairs in one scan"""
+        tagged = THEME_TAGGER.tag_batch(f"{synopsis} {categories}" for synopsis, categories in texts)
+        return [themes if themes else ["General"] for themes in tagged]
+    
+    @staticmethod
+    def calculate_quality_score(film_data):
         """Calculate quality score based on available data"""
         score = 5.0  # Base score
         
@@ -114,7 +189,8 @@ class FilmDatabase:
         
         return max(1.0, min(10.0, round(score, 1)))
     
-    def calculate_market_score(self, film_data):
+    @staticmethod
+    def calculate_market_score(film_data):
         """Calculate market score based on available data"""
         score = 5.0  # Base score
         
@@ -139,9 +215,21 @@ class FilmDatabase:
         
         return max(1.0, min(10.0, round(score, 1)))
     
-    def import_from_csv(self):
+    def import_from_csv(self, workers=1):
         """Import films from FilmFreeway CSV export"""
-        self.films = []
+        self.films = self.read_csv_films(workers=workers)
+    
+    def read_csv_films(self, workers=1):
+        """Read and score the films in the FilmFreeway CSV export
+        
+        With workers > 1 rows are scored in a process pool; ids and
+        duplicate-title handling are identical to the serial import.
+        """
+        if workers > 1 and os.path.exists(self.csv_file):
+            from csv_importer import score_csv_parallel
+            return self._assign_ids(score_csv_parallel(self.csv_file, workers))
+        
+        films = []
         seen_titles = set()
         
         try:
@@ -156,59 +244,94 @@ class FilmDatabase:
                     
                     seen_titles.add(title)
                     
-                    # Parse the data
-                    duration_minutes = self.parse_duration(row.get('Duration', ''))
-                    genres = self.extract_genres(row.get('Genres', ''))
-                    categories = row.get('Submission Categories', '')
-                    synopsis = row.get('Synopsis', '')
-                    themes = self.determine_themes(synopsis, categories)
-                    
-                    film = {
-                        "id": f"FILM_{len(self.films)+1:04d}",
-                        "tracking_number": row.get('Tracking Number', ''),
-                        "title": title,
-                        "director": row.get('Directors', f"{row.get('First Name', '')} {row.get('Last Name', '')}").strip(),
-                        "genre": genres[0] if genres else "General",
-                        "genres": genres,
-                        "duration_minutes": duration_minutes,
-                        "country": row.get('Country of Origin', row.get('Country', '')),
-                        "language": row.get('Language', 'Unknown'),
-                        "synopsis": synopsis[:500] if synopsis else "",
-                        "themes": themes,
-                        "categories": categories,
-                        "project_type": row.get('Project Type', 'Short'),
-                        "production_budget": row.get('Production Budget', ''),
-                        "completion_date": row.get('Completion Date', ''),
-                        "first_time_filmmaker": row.get('First-time Filmmaker', '').lower() == 'yes',
-                        "submission_date": row.get('Submission Date', ''),
-                        "submission_status": row.get('Submission Status', ''),
-                        "judging_status": row.get('Judging Status', 'Undecided'),
-                        "screenings_awards": row.get('Screenings / Awards', ''),
-                        "director_email": row.get('Email', ''),
-                        "submission_link": row.get('Submission Link', ''),
-                        # Calculated scores
-                        "technical_quality": self.calculate_quality_score(row),
-                        "narrative_score": round(random.uniform(5.0, 9.0), 1),
-                        "originality_score": round(random.uniform(4.0, 9.0), 1),
-                        # Status for PACCS processing
-                        "status": "pending",
-                        "paccs_processed": False
-                    }
-                    
-                    # Recalculate with full film data
-                    film["technical_quality"] = self.calculate_quality_score(film)
-                    film["market_score"] = self.calculate_market_score(film)
-                    
-                    self.films.append(film)
+                    film = self.build_film(row, f"FILM_{len(films)+1:04d}")
+                    films.append(film)
                     
                     # Progress indicator
-                    if len(self.films) % 500 == 0:
-                        print(f"  Imported {len(self.films)} films...")
+                    if len(films) % 500 == 0:
+                        print(f"  Imported {len(films)} films...")
         
         except FileNotFoundError:
             print(f"CSV file not found: {self.csv_file}")
             print("Falling back to sample data...")
-            self.generate_sample_films()
+            return self.generate_sample_films()
+        
+        return films
+    
+    @staticmethod
+    def _assign_ids(scored_films):
+        """Number scored films in file order, dropping repeated titles"""
+        films = []
+        seen_titles = set()
+        for film in scored_films:
+            title = film['title']
+            if title in seen_titles:
+                continue
+            seen_titles.add(title)
+            film['id'] = f"FILM_{len(films)+1:04d}"
+            films.append(film)
+            
+            if len(films) % 500 == 0:
+                print(f"  Imported {len(films)} films...")
+        return films
+    
+    @staticmethod
+    def row_hash(row):
+        """Stable fingerprint of a CSV row, used to spot changed rows on re-import"""
+        if None in row:
+            # csv.DictReader files a ragged row's surplus fields under None,
+            # which json can't sort against the string keys
+            row = {**{k: v for k, v in row.items() if k is not None}, "_extra_fields": row[None]}
+        payload = json.dumps(row, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def build_film(cls, row, film_id):
+        """Build a scored film record from one FilmFreeway CSV row"""
+        # Parse the data
+        duration_minutes = cls.parse_duration(row.get('Duration', ''))
+        genres = cls.extract_genres(row.get('Genres', ''))
+        categories = row.get('Submission Categories', '')
+        synopsis = row.get('Synopsis', '')
+        themes = cls.determine_themes(synopsis, categories)
+        
+        film = {
+            "id": film_id,
+            "tracking_number": row.get('Tracking Number', ''),
+            "title": row.get('Project Title', '').strip(),
+            "director": row.get('Directors', f"{row.get('First Name', '')} {row.get('Last Name', '')}").strip(),
+            "genre": genres[0] if genres else "General",
+            "genres": genres,
+            "duration_minutes": duration_minutes,
+            "country": row.get('Country of Origin', row.get('Country', '')),
+            "language": row.get('Language', 'Unknown'),
+            "synopsis": synopsis[:500] if synopsis else "",
+            "themes": themes,
+            "categories": categories,
+            "project_type": row.get('Project Type', 'Short'),
+            "production_budget": row.get('Production Budget', ''),
+            "completion_date": row.get('Completion Date', ''),
+            "first_time_filmmaker": row.get('First-time Filmmaker', '').lower() == 'yes',
+            "submission_date": row.get('Submission Date', ''),
+            "submission_status": row.get('Submission Status', ''),
+            "judging_status": row.get('Judging Status', 'Undecided'),
+            "screenings_awards": row.get('Screenings / Awards', ''),
+            "director_email": row.get('Email', ''),
+            "submission_link": row.get('Submission Link', ''),
+            # Calculated scores (technical quality is scored below,
+            # once the full film record exists)
+            "technical_quality": 0.0,
+            "narrative_score": round(random.uniform(5.0, 9.0), 1),
+            "originality_score": round(random.uniform(4.0, 9.0), 1),
+            # Status for PACCS processing
+            "status": "pending",
+            "paccs_processed": False,
+            "source_hash": cls.row_hash(row)
+        }
+        
+        film["technical_quality"] = cls.calculate_quality_score(film)
+        film["market_score"] = cls.calculate_market_score(film)
+        return film
     
     def generate_sample_films(self):
         """Fallback: Generate sample films if CSV not found"""
@@ -217,9 +340,9 @@ class FilmDatabase:
         countries = ["UK", "USA", "India", "Japan", "France", "Germany", 
                     "South Korea", "Brazil", "Nigeria", "Thailand"]
         
-        self.films = []
+        films = []
         for i in range(50):
-            self.films.append({
+            films.append({
                 "id": f"FILM_{i+1:04d}",
                 "title": f"Sample Film {i+1}",
                 "genre": random.choice(genres),
@@ -230,49 +353,125 @@ class FilmDatabase:
                 "originality_score": round(random.uniform(3.0, 10.0), 1),
                 "status": "pending"
             })
+        return films
     
     def save(self):
-        """Save database to file"""
-        with open(self.db_file, 'w') as f:
-            json.dump(self.films, f, indent=2)
+        """Save database to file (atomically, via temp file and rename)"""
+        tmp_file = f"{self.db_file}.tmp"
+        with self._lock:
+            with open(tmp_file, 'w') as f:
+                json.dump(self.films, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.db_file)
+            try:
+                write_snapshot(self.db_file, self.films)
+            except OSError as e:
+                print(f"Could not write snapshot for {self.db_file}: {e}")
+    
+    def _mark_dirty(self, *film_ids):
+        """Record changed films and save now or schedule a coalesced flush"""
+        with self._lock:
+            self._dirty.update(film_ids)
+            if not self.write_behind or len(self._dirty) >= self.flush_threshold:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def flush(self):
+        """Write pending changes to disk"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+            self.save()
+            self._dirty.clear()
     
     def get_film(self, film_id):
         """Get a specific film by ID"""
-        for film in self.films:
-            if film['id'] == film_id:
-                return film
-        return None
+        return self._by_id.get(film_id)
+    
+    def get_films_by(self, field, value):
+        """Get all films whose indexed field equals value"""
+        if field not in self._indexes:
+            raise ValueError(f"{field} is not an indexed field (use one of {', '.join(self.INDEXED_FIELDS)})")
+        return list(self._indexes[field].get(value, {}).values())
+    
+    def count_films_by(self, field):
+        """Count films per value of an indexed field"""
+        if field not in self._indexes:
+            raise ValueError(f"{field} is not an indexed field (use one of {', '.join(self.INDEXED_FIELDS)})")
+        return {value: len(bucket) for value, bucket in self._indexes[field].items()}
+    
+    def find_films(self, **criteria):
+        """Get films matching every indexed field=value criterion"""
+        if not criteria:
+            return list(self.films)
+        
+        buckets = []
+        for field, value in criteria.items():
+            if field not in self._indexes:
+                raise ValueError(f"{field} is not an indexed field (use one of {', '.join(self.INDEXED_FIELDS)})")
+            buckets.append(self._indexes[field].get(value, {}))
+        
+        # Walk the smallest bucket and probe the others
+        buckets.sort(key=len)
+        smallest, rest = buckets[0], buckets[1:]
+        return [film for film_id, film in smallest.items() if all(film_id in b for b in rest)]
     
     def get_pending_films(self):
         """Get all films awaiting PACCS review"""
-        return [f for f in self.films if f['status'] == 'pending']
+        return self.get_films_by('status', 'pending')
     
     def get_reviewed_films(self):
         """Get all PACCS reviewed films"""
-        return [f for f in self.films if f['status'] == 'reviewed']
+        return self.get_films_by('status', 'reviewed')
     
     def update_film_status(self, film_id, status):
         """Update a film's status"""
-        for film in self.films:
-            if film['id'] == film_id:
-                film['status'] = status
-                self.save()
-                return True
-        return False
+        with self._lock:
+            film = self._by_id.get(film_id)
+            if film is None:
+                return False
+            self._set_field(film, 'status', status)
+            if self._columns is not None:
+                self._columns.set_value(self._column_rows[film_id], 'status', status)
+            self._mark_dirty(film_id)
+        return True
+    
+    def upsert_films(self, films):
+        """Add new films and replace existing ones (matched by id) in place"""
+        with self._lock:
+            for film in films:
+                existing = self._by_id.get(film['id'])
+                if existing is None:
+                    self.films.append(film)
+                    self._index_film(film)
+                    if self._columns is not None:
+                        self._column_rows[film['id']] = self._columns.append(film)
+                elif existing is not film:
+                    # Update the existing dict so its list slot is kept
+                    self._unindex_film(existing)
+                    existing.clear()
+                    existing.update(film)
+                    self._index_film(existing)
+                    if self._columns is not None:
+                        self._columns.set(self._column_rows[film['id']], existing)
+            self._mark_dirty(*(film['id'] for film in films))
     
     def get_statistics(self):
         """Get database statistics"""
         total = len(self.films)
-        pending = len(self.get_pending_films())
-        reviewed = len(self.get_reviewed_films())
+        status_counts = self.count_films_by('status')
+        pending = status_counts.get('pending', 0)
+        reviewed = status_counts.get('reviewed', 0)
         
-        genres = {}
-        countries = {}
-        for film in self.films:
-            g = film.get('genre', 'Unknown')
-            genres[g] = genres.get(g, 0) + 1
-            c = film.get('country', 'Unknown')
-            countries[c] = countries.get(c, 0) + 1
+        genres = self.count_films_by('genre')
+        countries = self.count_films_by('country')
         
         return {
             "total_films": total,
@@ -282,6 +481,44 @@ class FilmDatabase:
             "countries": countries,
             "top_countries": sorted(countries.items(), key=lambda x: x[1], reverse=True)[:10]
         }
+    
+    
+    def _film_columns(self):
+        """Columnar view of the films, kept up to date once built"""
+        with self._lock:
+            if self._columns is None:
+                self._columns = film_columns(self.films)
+                self._column_rows = {film['id']: row for row, film in enumerate(self.films)}
+            return self._columns
+    
+    def get_score_statistics(self, bins=10):
+        """Distribution of the film scores, overall and by genre/country"""
+        columns = self._film_columns()
+        score_fields = ('technical_quality', 'narrative_score', 'originality_score', 'market_score')
+        return {
+            "total_films": len(columns),
+            "scores": {field: columns.summary(field) for field in score_fields},
+            "histograms": {field: columns.histogram(field, bins=bins, value_range=(0, 10))
+                           for field in score_fields},
+            "duration_minutes": columns.summary('duration_minutes'),
+            "by_genre": {field: columns.group_mean(field, 'genre') for field in score_fields},
+            "by_country": {field: columns.group_mean(field, 'country') for field in score_fields}
+        }
+
+
+def open_database(backend=None, **kwargs):
+    """Open the film database with the configured storage backend
+    
+    backend is 'json' (default) or 'sqlite'; when omitted it is read from
+    the PACCS_DB_BACKEND environment variable.
+    """
+    backend = (backend or os.environ.get('PACCS_DB_BACKEND', 'json')).lower()
+    if backend == 'sqlite':
+        from sqlite_database import SQLiteFilmDatabase
+        return SQLiteFilmDatabase(**kwargs)
+    if backend == 'json':
+        return FilmDatabase(**kwargs)
+    raise ValueError(f"Unknown database backend: {backend}")
 
 
 # Test the database
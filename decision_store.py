@@ -0,0 +1,170 @@
+"""
+PACCS Decision Store
+Append-only JSONL log of consensus decisions
+- One line per saved decision, written with a single append
+- Offset index keyed by film_id for O(1) lookups
+- Periodic compaction drops decisions that have been superseded
+- Imports the legacy paccs_decisions.json on first use
+"""
+import json
+import os
+
+
+class DecisionStore:
+    """Line-delimited decision log with a film_id offset index"""
+    
+    def __init__(self, path="paccs_decisions.jsonl", legacy_file="paccs_decisions.json",
+                 compact_ratio=0.5, compact_min_records=500):
+        self.path = path
+        self.legacy_file = legacy_file
+        self.compact_ratio = compact_ratio
+        self.compact_min_records = compact_min_records
+        self.index = {}          # film key -> byte offset of its latest record
+        self.total_records = 0   # lines in the log, including superseded ones
+    
+    @staticmethod
+    def _key(decision, offset):
+        """Index key for a decision (films without an id are never superseded)"""
+        film_id = decision.get('film_id')
+        return film_id if film_id is not None else f"_offset_{offset}"
+    
+    @staticmethod
+    def _encode(decision):
+        """Serialise a decision as one compact JSON line"""
+        record = {k: v for k, v in decision.items() if k != 'report'}
+        return (json.dumps(record, separators=(',', ':')) + "\n").encode('utf-8')
+    
+    def __len__(self):
+        return len(self.index)
+    
+    def __contains__(self, film_id):
+        return film_id in self.index
+    
+    def load(self):
+        """Stream the log, returning the live decisions in first-seen order
+        
+        A re-processed film keeps the position of its first decision but
+        takes the content of its latest one, matching how
+        ConsensusProtocol replaces decisions in memory.
+        """
+        if not os.path.exists(self.path):
+            self._import_legacy()
+        
+        self.index = {}
+        self.total_records = 0
+        live = {}
+        
+        if not os.path.exists(self.path):
+            return []
+        
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                line_offset = offset
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    decision = json.loads(line)
+                except ValueError:
+                    # A torn final write from a crash; everything before it is intact
+                    print(f"Skipping unreadable decision record at byte {line_offset}")
+                    continue
+                key = self._key(decision, line_offset)
+                self.index[key] = line_offset
+                live[key] = decision
+                self.total_records += 1
+        
+        return list(live.values())
+    
+    def _import_legacy(self):
+        """Convert a legacy paccs_decisions.json array into the log"""
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return
+        try:
+            with open(self.legacy_file, 'r') as f:
+                decisions = json.load(f)
+        except ValueError:
+            print(f"Could not read legacy decisions from {self.legacy_file}")
+            return
+        
+        self._write_all(decisions)
+        print(f"Migrated {len(decisions)} decisions from {self.legacy_file} to {self.path}")
+    
+    def get(self, film_id):
+        """Read the latest decision for a film straight from the log"""
+        offset = self.index.get(film_id)
+        if offset is None:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+    
+    def append(self, decision):
+        """Append one decision; costs a single line write"""
+        self.append_many([decision])
+    
+    def append_many(self, decisions):
+        """Append several decisions with one open/flush"""
+        if not decisions:
+            return
+        
+        with open(self.path, 'ab') as f:
+            offset = f.tell()
+            for decision in decisions:
+                line = self._encode(decision)
+                f.write(line)
+                self.index[self._key(decision, offset)] = offset
+                offset += len(line)
+                self.total_records += 1
+            f.flush()
+            os.fsync(f.fileno())
+        
+        if self.needs_compaction():
+            self.compact()
+    
+    def needs_compaction(self):
+        """True once enough of the log is superseded records"""
+        dead = self.total_records - len(self.index)
+        return (self.total_records >= self.compact_min_records
+                and dead > self.total_records * self.compact_ratio)
+    
+    def iter_live(self):
+        """Yield the live decisions in first-seen order"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            # The index keeps each film's original insertion slot even
+            # after its offset moves to a newer record
+            for offset in self.index.values():
+                f.seek(offset)
+                yield json.loads(f.readline())
+    
+    def compact(self):
+        """Rewrite the log keeping only the latest decision per film"""
+        live = list(self.iter_live())
+        self._write_all(live)
+        print(f"Compacted decision log to {len(live)} records")
+    
+    def _write_all(self, decisions):
+        """Replace the log atomically with the given decisions"""
+        tmp_path = self.path + ".tmp"
+        self.index = {}
+        self.total_records = 0
+        
+        with open(tmp_path, 'wb') as f:
+            offset = 0
+            for decision in decisions:
+                line = self._encode(decision)
+                f.write(line)
+                self.index[self._key(decision, offset)] = offset
+                offset += len(line)
+                self.total_records += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+    
+    def export_json(self, filename="paccs_decisions.json"):
+        """Write the live decisions as a single JSON array (legacy format)"""
+        with open(filename, 'w') as f:
+            json.dump(list(self.iter_live()), f, indent=2)
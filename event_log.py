@@ -0,0 +1,158 @@
+"""
+PACCS Event Log
+Structured negotiation events, kept off the processing hot path
+- Events are dicts (timestamp, type, agent, message) with a log level
+- Console/file output is queued and written by a background listener
+  thread, so agents never wait on stdout
+- Each film's events go into a bounded ring buffer that becomes its
+  decision's audit_log
+- Quiet mode builds no output at all; audit trails are still recorded
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from collections import deque
+
+AUDIT_LOG_SIZE = 256  # events kept per film (a film logs ~20)
+
+# Event type -> level; anything unlisted is INFO
+EVENT_LEVELS = {
+    "CONFLICT": logging.WARNING,
+    "ESCALATION": logging.WARNING,
+    "ERROR": logging.ERROR,
+}
+
+
+class _Clock:
+    """'%H:%M:%S.mmm' timestamps, formatting the seconds part once per second"""
+    
+    def __init__(self):
+        self._second = None
+        self._prefix = ""
+    
+    def __call__(self):
+        now = time.time()
+        second = int(now)
+        if second != self._second:
+            self._prefix = time.strftime('%H:%M:%S', time.localtime(second))
+            self._second = second
+        return f"{self._prefix}.{int((now - second) * 1000):03d}"
+
+
+class _EventFormatter(logging.Formatter):
+    """Console layout: '  [time] agent: message' for events, plain text otherwise"""
+    
+    def format(self, record):
+        event = getattr(record, 'event', None)
+        if event is None:
+            return record.getMessage()
+        return f"  [{event['timestamp']}] {event['agent'] or 'SYSTEM'}: {event['message']}"
+
+
+class FilmEventLog:
+    """Events for one film run; not shared between threads"""
+    
+    def __init__(self, event_log, size=AUDIT_LOG_SIZE):
+        self._event_log = event_log
+        self.events = deque(maxlen=size)
+        self.enabled = event_log.enabled
+    
+    def event(self, event_type, message, agent=None):
+        """Record an event and, unless quiet, queue it for output"""
+        entry = {
+            'timestamp': self._event_log.clock(),
+            'type': event_type,
+            'agent': agent,
+            'message': message
+        }
+        self.events.append(entry)
+        if self.enabled:
+            self._event_log.emit(EVENT_LEVELS.get(event_type, logging.INFO), entry)
+        return entry
+    
+    def info(self, text):
+        """Queue a plain output line (banners, summaries)"""
+        if self.enabled:
+            self._event_log.info(text)
+    
+    def audit_log(self):
+        """Events so far, as stored on the decision"""
+        return list(self.events)
+
+
+class EventLog:
+    """Shared output side of the event log
+    
+    verbose=False with no path is the quiet mode: no logger, no queue and
+    no listener thread, and callers can skip building banner text by
+    checking `enabled`.
+    """
+    
+    def __init__(self, verbose=True, path=None, level=logging.INFO, stream=None):
+        self.verbose = verbose
+        self.path = path
+        self.clock = _Clock()
+        self._queue = None
+        self._listener = None
+        self._logger = None
+        self._running = False
+        
+        handlers = []
+        if verbose:
+            handlers.append(logging.StreamHandler(stream or sys.stdout))
+        if path:
+            handlers.append(logging.FileHandler(path, encoding='utf-8'))
+        self.enabled = bool(handlers)
+        if not handlers:
+            return
+        
+        formatter = _EventFormatter()
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        
+        self._queue = queue.Queue()
+        # A private logger per EventLog, so protocols don't share handlers
+        self._logger = logging.Logger("paccs.events", level)
+        self._logger.addHandler(logging.handlers.QueueHandler(self._queue))
+        self._listener = logging.handlers.QueueListener(self._queue, *handlers)
+        self._listener.start()
+        self._running = True
+        atexit.register(self.close)
+    
+    def film(self, size=AUDIT_LOG_SIZE):
+        """New per-film event buffer"""
+        return FilmEventLog(self, size)
+    
+    def emit(self, level, event):
+        """Queue an event for output"""
+        if self._logger is not None:
+            self._logger.log(level, event['message'], extra={'event': event})
+    
+    def info(self, text):
+        """Queue a plain output line"""
+        if self._logger is not None:
+            self._logger.info(text)
+    
+    def warning(self, text):
+        """Queue a plain warning line"""
+        if self._logger is not None:
+            self._logger.warning(text)
+    
+    def flush(self):
+        """Block until every queued line has been written"""
+        if self._running:
+            self._queue.join()
+    
+    def close(self):
+        """Write what is queued, stop the listener thread and release the log file"""
+        if not self._running:
+            return
+        self._running = False
+        atexit.unregister(self.close)
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.flush()
+            handler.close()  # a StreamHandler leaves its stream open
@@ -2,8 +2,12 @@
 PACCS Main Program
 Command-line interface for the system
 """
-from database import FilmDatabase
+import os
+
+from database import open_database
 from consensus import ConsensusProtocol
+from agent_cache import AgentCache
+from batch_jobs import BatchJob, run_job, unfinished_jobs
 
 def print_menu():
     """Display main menu"""
@@ -13,19 +17,23 @@ def print_menu():
     print("1. View database statistics")
     print("2. Process single film")
     print("3. Process batch (5 films)")
-    print("4. View all decisions")
-    print("5. Export decisions to JSON")
-    print("6. Exit")
+    print("4. Process all pending (parallel)")
+    print("5. Resume interrupted batch")
+    print("6. View all decisions")
+    print("7. Export decisions to JSON")
+    print("8. Exit")
     print("-"*50)
 
 def main():
     """Main program loop"""
-    db = FilmDatabase()
-    consensus = ConsensusProtocol()
+    db = open_database(write_behind=True)
+    consensus = ConsensusProtocol(cache=AgentCache(path="paccs_agent_cache.pickle"))
     
     while True:
+        # Let queued negotiation output finish before the menu redraws
+        consensus.events.flush()
         print_menu()
-        choice = input("Select option (1-6): ").strip()
+        choice = input("Select option (1-8): ").strip()
         
         if choice == "1":
             stats = db.get_statistics()
@@ -68,6 +76,7 @@ def main():
             for film in batch:
                 consensus.process_film(film)
                 db.update_film_status(film['id'], 'reviewed')
+            db.flush()
             
             print(f"\nBatch complete! Processed {len(batch)} films.")
             
@@ -76,6 +85,34 @@ def main():
             print(f"Pathways: {stats['pathways']}")
         
         elif choice == "4":
+            pending = db.get_pending_films()
+            if not pending:
+                print("\nNo pending films to process!")
+                continue
+            
+            # Checkpointed, so an interrupted run can be resumed with option 5
+            job = BatchJob([film['id'] for film in pending])
+            run_job(job, consensus, db, workers=os.cpu_count())
+            
+            print(f"\nBatch complete! Processed {len(job.completed)} films (job {job.job_id}).")
+            
+            stats = consensus.get_statistics()
+            print(f"Average confidence: {stats['avg_confidence']}")
+            print(f"Pathways: {stats['pathways']}")
+        
+        elif choice == "5":
+            jobs = unfinished_jobs()
+            if not jobs:
+                print("\nNo interrupted batches to resume!")
+                continue
+            
+            job = jobs[0]
+            progress = job.progress()
+            print(f"\nResuming job {job.job_id}: {progress['remaining']} of {progress['total']} films left")
+            run_job(job, consensus, db, workers=os.cpu_count())
+            print(f"\nBatch complete! Processed {len(job.completed)} films, skipped {len(job.skipped)}.")
+        
+        elif choice == "6":
             if not consensus.decisions:
                 print("\nNo decisions yet. Process some films first!")
                 continue
@@ -85,20 +122,21 @@ def main():
                 flag = " [ESCALATE]" if d['needs_escalation'] else ""
                 print(f"  {d['film_title']}: {d['pathway']} (Score: {d['final_score']}){flag}")
         
-        elif choice == "5":
+        elif choice == "7":
             if not consensus.decisions:
                 print("\nNo decisions to export!")
                 continue
             
             consensus.save_decisions()
-            print("Decisions exported to paccs_decisions.json")
+            consensus.export_decisions()
         
-        elif choice == "6":
+        elif choice == "8":
+            db.flush()
             print("\nThank you for using PACCS!")
             break
         
         else:
-            print("\nInvalid option. Please select 1-6.")
+            print("\nInvalid option. Please select 1-8.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,197 @@
+"""
+PACCS Match Indexes
+Precompiled lookup structures for festival and distributor matching
+- Festivals partitioned by duration preference ("both" sits in each)
+- Distributors partitioned by catalogue category
+- Genre/theme -> entry posting lists, sorted by min_score so entries a
+  film doesn't qualify for are cut off with bisect
+- Top matches picked with a bounded heap, in the same order as a
+  stable sort of the full table
+"""
+import heapq
+import json
+from bisect import bisect_right
+
+ALL_GENRES = "All"
+ALL_DISTRIBUTOR_GENRES = "All genres"
+GLOBAL_TERRITORY = "Global"
+
+
+class _PostingList:
+    """Entries sorted by min_score, with their table positions"""
+    
+    def __init__(self):
+        self.min_scores = []
+        self.positions = []
+    
+    def add(self, min_score, position):
+        self.min_scores.append(min_score)
+        self.positions.append(position)
+    
+    def finish(self):
+        """Sort by min_score (table order among equal scores)"""
+        order = sorted(range(len(self.positions)), key=lambda i: (self.min_scores[i], self.positions[i]))
+        self.min_scores = [self.min_scores[i] for i in order]
+        self.positions = [self.positions[i] for i in order]
+    
+    def eligible(self, score):
+        """Table positions of the entries whose min_score is at most score"""
+        return self.positions[:bisect_right(self.min_scores, score)]
+
+
+class FestivalIndex:
+    """Festival table compiled for fast film -> festival matching"""
+    
+    DURATION_TYPES = ("short", "feature")
+    
+    def __init__(self, festivals):
+        self.festivals = list(festivals)
+        # duration type -> label (genre or theme, or "All") -> posting list
+        self._partitions = {duration_type: {} for duration_type in self.DURATION_TYPES}
+        
+        for position, festival in enumerate(self.festivals):
+            for duration_type, postings in self._partitions.items():
+                if festival['duration_pref'] not in ("both", duration_type):
+                    continue
+                for label in set(festival['genres']):
+                    if label not in postings:
+                        postings[label] = _PostingList()
+                    postings[label].add(festival['min_score'], position)
+        
+        for postings in self._partitions.values():
+            for posting_list in postings.values():
+                posting_list.finish()
+    
+    @classmethod
+    def from_file(cls, path):
+        """Load a festival directory (a JSON list of festival dicts)"""
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+    
+    def __len__(self):
+        return len(self.festivals)
+    
+    def _eligible(self, postings, labels, score):
+        """Positions of qualifying festivals listed under any of labels"""
+        found = set()
+        for label in labels:
+            posting_list = postings.get(label)
+            if posting_list is not None:
+                found.update(posting_list.eligible(score))
+        return found
+    
+    def match(self, quality_score, duration_type, genre, genres, themes, limit=10):
+        """Best festival matches for a film, as FestivalMatchingAgent reports them
+        
+        Festivals open to all genres are scored first, then genre matches,
+        then theme matches; each festival is only counted once.
+        """
+        postings = self._partitions.get(duration_type, {})
+        open_to_all = self._eligible(postings, (ALL_GENRES,), quality_score)
+        genre_matches = self._eligible(postings, [genre, *genres], quality_score) - open_to_all
+        theme_matches = self._eligible(postings, themes, quality_score) - open_to_all - genre_matches
+        
+        base = 50 + int(quality_score * 3)
+        candidates = []
+        for positions, bonus, reason in ((open_to_all, 15, "Open to all genres"),
+                                         (genre_matches, 25, f"Genre match: {genre}"),
+                                         (theme_matches, 20, "Theme alignment")):
+            match_score = base + bonus
+            if match_score < 50:
+                continue
+            capped = min(100, match_score)
+            candidates.extend((capped, position, reason) for position in positions)
+        
+        # Highest score first, table order among ties: a stable sort's order
+        best = heapq.nsmallest(limit, candidates, key=lambda c: (-c[0], c[1]))
+        matches = []
+        for match_score, position, reason in best:
+            festival = self.festivals[position]
+            matches.append({
+                "name": festival['name'],
+                "country": festival['country'],
+                "tier": festival['tier'],
+                "match_score": match_score,
+                "prestige": festival['prestige'],
+                "reasons": [reason]
+            })
+        return matches
+
+
+class DistributorCatalogue:
+    """Distributor/buyer list compiled for fast film -> distributor matching
+    
+    Built from a {category: [distributor, ...]} table like
+    MarketIntelligenceAgent.distributors. Each category gets score-sorted
+    posting lists for its "All genres" distributors and for every focus
+    genre, plus a territory set per distributor.
+    """
+    
+    def __init__(self, distributors):
+        self.distributors = {category: list(entries) for category, entries in distributors.items()}
+        self._territories = {}
+        # category -> focus genre (or "All genres") -> posting list
+        self._postings = {}
+        # category -> posting list of every distributor (no genre filter)
+        self._everyone = {}
+        
+        for category, entries in self.distributors.items():
+            postings = self._postings[category] = {}
+            everyone = self._everyone[category] = _PostingList()
+            territories = self._territories[category] = []
+            for position, dist in enumerate(entries):
+                everyone.add(dist['min_score'], position)
+                territories.append(frozenset(dist.get('territories', ())))
+                for label in set(dist.get('focus', ())):
+                    if label not in postings:
+                        postings[label] = _PostingList()
+                    postings[label].add(dist['min_score'], position)
+            
+            everyone.finish()
+            for posting_list in postings.values():
+                posting_list.finish()
+    
+    @classmethod
+    def from_file(cls, path):
+        """Load a catalogue (a JSON object of category -> distributor list)"""
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+    
+    def __len__(self):
+        return sum(len(entries) for entries in self.distributors.values())
+    
+    def eligible(self, category, market_score, genre=None, territory=None):
+        """Yield (table position, distributor) for qualifying distributors
+        
+        With a genre only distributors open to all genres or focused on it
+        qualify; with a territory only those covering it (or "Global") do.
+        Positions are unique but not yielded in table order.
+        """
+        entries = self.distributors.get(category)
+        if not entries:
+            return
+        
+        if genre is None:
+            positions = self._everyone[category].eligible(market_score)
+        else:
+            postings = self._postings[category]
+            positions = set()
+            for label in (ALL_DISTRIBUTOR_GENRES, genre):
+                posting_list = postings.get(label)
+                if posting_list is not None:
+                    positions.update(posting_list.eligible(market_score))
+        
+        territories = self._territories[category]
+        for position in positions:
+            if territory is None or territory in territories[position] or GLOBAL_TERRITORY in territories[position]:
+                yield position, entries[position]
+    
+    @staticmethod
+    def top(candidates, limit):
+        """Best (match_score, group, position, ...) candidates
+        
+        Highest score first; among equal scores lower groups, then lower
+        table positions, come first, which is the order a stable sort of
+        the groups' concatenated lists would give.
+        """
+        return heapq.nsmallest(limit, candidates, key=lambda c: (-c[0], c[1], c[2]))
@@ -0,0 +1,179 @@
+"""
+PACCS Streaming Pipeline
+The consensus phases as composable generator stages
+- films -> quality -> market -> routing -> prediction/comparison -> sink
+- Stages pull one film at a time, so memory stays bounded however long
+  the input is, and a slow sink holds the upstream stages back
+- Sinks for the JSONL decision log, a SQLite table and an NDJSON HTTP
+  response body
+"""
+import csv
+import json
+import sqlite3
+
+from database import FilmDatabase
+
+
+def csv_films(csv_file):
+    """Stream films from a FilmFreeway CSV export, one row at a time
+    
+    Ids and duplicate-title handling match FilmDatabase.read_csv_films.
+    """
+    seen_titles = set()
+    count = 0
+    with open(csv_file, 'r', encoding='utf-8', errors='ignore') as f:
+        for row in csv.DictReader(f):
+            title = row.get('Project Title', '').strip()
+            if not title or title in seen_titles:
+                continue
+            seen_titles.add(title)
+            count += 1
+            yield FilmDatabase.build_film(row, f"FILM_{count:04d}")
+
+
+def begin_stage(films, consensus):
+    """Open a FilmRun per film"""
+    for film in films:
+        yield consensus.begin_film(film)
+
+
+def quality_stage(runs, consensus):
+    """Phase 1"""
+    for run in runs:
+        yield consensus.phase_quality(run)
+
+
+def market_stage(runs, consensus):
+    """Phases 2 and 3"""
+    for run in runs:
+        yield consensus.phase_market(run)
+
+
+def routing_stage(runs, consensus):
+    """Phase 4"""
+    for run in runs:
+        yield consensus.phase_routing(run)
+
+
+def prediction_stage(runs, consensus):
+    """Phase 5 (success prediction and comparison)"""
+    for run in runs:
+        yield consensus.phase_prediction(run)
+
+
+def decision_stage(runs, consensus, generate_report=False, record=False):
+    """Phase 6: turn each run into its decision record
+    
+    Decisions are not kept on the protocol unless record=True; later films
+    are still ranked against them.
+    """
+    for run in runs:
+        yield consensus.finish_film(run, generate_report=generate_report, record=record)
+
+
+def run_pipeline(films, consensus, generate_report=False, record=False):
+    """The full pipeline: an iterator of films in, decisions out"""
+    runs = begin_stage(films, consensus)
+    runs = quality_stage(runs, consensus)
+    runs = market_stage(runs, consensus)
+    runs = routing_stage(runs, consensus)
+    runs = prediction_stage(runs, consensus)
+    return decision_stage(runs, consensus, generate_report=generate_report, record=record)
+
+
+def _batches(items, size):
+    """Lists of up to size items"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _serialisable(decision):
+    """A decision without its (non-JSON) report"""
+    return {k: v for k, v in decision.items() if k != 'report'}
+
+
+def store_sink(decisions, store, batch_size=100):
+    """Append decisions to a DecisionStore (the JSONL decision log)
+    
+    Returns the number written.
+    """
+    written = 0
+    for batch in _batches(decisions, batch_size):
+        store.append_many(batch)
+        written += len(batch)
+    return written
+
+
+DECISIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    film_id TEXT PRIMARY KEY,
+    film_title TEXT,
+    pathway TEXT,
+    final_score REAL,
+    final_confidence REAL,
+    needs_escalation INTEGER,
+    config_fingerprint TEXT,
+    processed_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_decisions_pathway ON decisions(pathway);
+"""
+
+
+def sqlite_sink(decisions, sqlite_file, batch_size=100):
+    """Upsert decisions into a SQLite decisions table, one transaction per batch
+    
+    Returns the number written.
+    """
+    conn = sqlite3.connect(sqlite_file, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(DECISIONS_SCHEMA)
+        written = 0
+        for batch in _batches(decisions, batch_size):
+            with conn:
+                conn.executemany(
+                    "INSERT INTO decisions (film_id, film_title, pathway, final_score, final_confidence, "
+                    "needs_escalation, config_fingerprint, processed_at, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(film_id) DO UPDATE SET film_title=excluded.film_title, pathway=excluded.pathway, "
+                    "final_score=excluded.final_score, final_confidence=excluded.final_confidence, "
+                    "needs_escalation=excluded.needs_escalation, config_fingerprint=excluded.config_fingerprint, "
+                    "processed_at=excluded.processed_at, data=excluded.data",
+                    [(str(d.get('film_id')), d.get('film_title'), d.get('pathway'), d.get('final_score'),
+                      d.get('final_confidence'), int(bool(d.get('needs_escalation'))), d.get('config_fingerprint'),
+                      d.get('processed_at'), json.dumps(_serialisable(d), separators=(',', ':')))
+                     for d in batch]
+                )
+            written += len(batch)
+        return written
+    finally:
+        conn.close()
+
+
+def ndjson_stream(decisions):
+    """Encode decisions as newline-delimited JSON chunks
+    
+    Suitable as a streaming HTTP body, e.g.
+    Response(ndjson_stream(run_pipeline(films, consensus)), mimetype='application/x-ndjson').
+    """
+    for decision in decisions:
+        yield (json.dumps(_serialisable(decision), separators=(',', ':')) + "\n").encode('utf-8')
+
+
+# Test
+if __name__ == "__main__":
+    import sys
+    from consensus import ConsensusProtocol
+    from decision_store import DecisionStore
+    
+    csv_file = sys.argv[1] if len(sys.argv) > 1 else "FilmFreeway-Submissions-2025-11-25-09-41-21.csv"
+    consensus = ConsensusProtocol(load_existing=False, verbose=False)
+    store = DecisionStore(path="paccs_pipeline_decisions.jsonl", legacy_file=None)
+    count = store_sink(run_pipeline(csv_films(csv_file), consensus), store)
+    print(f"✅ Streamed {count} decisions to {store.path}")
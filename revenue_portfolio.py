@@ -0,0 +1,124 @@
+"""
+PACCS Revenue Portfolio
+Catalogue-wide revenue valuation kept as arrays
+- One row per film: low/total/high estimates and the revenue channels
+- Updated incrementally as decisions arrive (latest estimate per film)
+- Totals by genre, pathway, country and revenue channel via bincount
+"""
+from columnar import ColumnTable
+
+REVENUE_CHANNELS = ('festival_circuit', 'streaming_rights', 'educational_licensing', 'other')
+
+
+def _estimate_field(name):
+    """Extractor for a top-level revenue estimate figure"""
+    return lambda record: (record.get('revenue_estimate') or {}).get(name, 0) or 0
+
+
+def _channel_field(name):
+    """Extractor for one revenue channel of the estimate breakdown"""
+    return lambda record: ((record.get('revenue_estimate') or {}).get('breakdown') or {}).get(name, 0) or 0
+
+
+PORTFOLIO_NUMERIC_FIELDS = {
+    "total_estimate": _estimate_field('total_estimate'),
+    "low_estimate": _estimate_field('low_estimate'),
+    "high_estimate": _estimate_field('high_estimate'),
+    **{channel: _channel_field(channel) for channel in REVENUE_CHANNELS},
+}
+
+PORTFOLIO_CATEGORICAL_FIELDS = {
+    "genre": lambda r: r.get('genre') or 'Unknown',
+    "country": lambda r: r.get('country') or 'Unknown',
+    "pathway": lambda r: r.get('pathway') or 'Unassigned',
+}
+
+
+class RevenuePortfolio:
+    """Revenue estimates for a catalogue of films, aggregated as arrays"""
+    
+    GROUP_FIELDS = tuple(PORTFOLIO_CATEGORICAL_FIELDS)
+    
+    def __init__(self):
+        self.table = ColumnTable(PORTFOLIO_NUMERIC_FIELDS, PORTFOLIO_CATEGORICAL_FIELDS)
+        self._rows = {}  # film_id -> row
+    
+    def __len__(self):
+        return len(self.table)
+    
+    @staticmethod
+    def _record(film_id, revenue_estimate, genre=None, country=None, pathway=None):
+        """Row record in the shape the column extractors read"""
+        return {"film_id": film_id, "revenue_estimate": revenue_estimate,
+                "genre": genre, "country": country, "pathway": pathway}
+    
+    def _upsert(self, record):
+        """Add a film's row, or overwrite it if the film is already in"""
+        film_id = record['film_id']
+        row = self._rows.get(film_id) if film_id is not None else None
+        if row is None:
+            row = self.table.append(record)
+            if film_id is not None:
+                self._rows[film_id] = row
+        else:
+            self.table.set(row, record)
+    
+    def add(self, film_id, revenue_estimate, genre=None, country=None, pathway=None):
+        """Add or replace one film's estimate"""
+        self._upsert(self._record(film_id, revenue_estimate, genre, country, pathway))
+    
+    def add_decision(self, decision):
+        """Add or replace a film's estimate from its consensus decision"""
+        film_data = decision.get('film_data') or {}
+        self.add(decision.get('film_id'), decision.get('revenue_estimate'),
+                 genre=film_data.get('genre'), country=film_data.get('country'), pathway=decision.get('pathway'))
+    
+    def add_films(self, films, market_scores, quality_scores, market_agent, pathways=None):
+        """Estimate and add a batch of films in one vectorised pass
+        
+        Uses MarketIntelligenceAgent.estimate_revenue_batch, so the
+        estimates match estimate_revenue film by film.
+        """
+        films = list(films)
+        estimates = market_agent.estimate_revenue_batch(films, market_scores, quality_scores)
+        pathways = pathways or [None] * len(films)
+        for film, estimate, pathway in zip(films, estimates, pathways):
+            self._upsert(self._record(film.get('id'), estimate, film.get('genre'), film.get('country'), pathway))
+    
+    def total(self, field='total_estimate'):
+        """Catalogue-wide sum of an estimate or channel"""
+        return float(self.table.column(field).sum())
+    
+    def by_channel(self):
+        """Total estimate per revenue channel"""
+        return {channel: self.total(channel) for channel in REVENUE_CHANNELS}
+    
+    def by(self, field):
+        """Films and low/total/high estimates per genre, country or pathway"""
+        if field not in PORTFOLIO_CATEGORICAL_FIELDS:
+            raise ValueError(f"Cannot group revenue by {field} (use one of {', '.join(self.GROUP_FIELDS)})")
+        films = self.table.counts(field)
+        sums = {name: self.table.group_sum(name, field) for name in ('low_estimate', 'total_estimate', 'high_estimate')}
+        return {
+            value: {
+                "films": count,
+                "low_estimate": sums['low_estimate'][value],
+                "total_estimate": sums['total_estimate'][value],
+                "high_estimate": sums['high_estimate'][value],
+            }
+            for value, count in films.items()
+        }
+    
+    def valuation(self):
+        """Full catalogue valuation"""
+        return {
+            "films": len(self),
+            "low_estimate": self.total('low_estimate'),
+            "total_estimate": self.total('total_estimate'),
+            "high_estimate": self.total('high_estimate'),
+            "by_channel": self.by_channel(),
+            "by_genre": self.by('genre'),
+            "by_pathway": self.by('pathway'),
+            "by_country": self.by('country'),
+            "currency": "GBP"
+        }
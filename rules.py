@@ -0,0 +1,191 @@
+"""
+PACCS Agent Rules
+Curated rule tables (genre trends, distributors, festivals, success
+indicators, theme lists) loaded from data/agent_rules.json
+- Validated and compiled once into frozensets and match indexes
+- One read-only instance shared by every agent in the process (and
+  inherited by forked workers)
+- Hot-reloaded when the file changes, checked at most every few seconds
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from match_index import DistributorCatalogue, FestivalIndex
+
+RULES_FILE = os.environ.get(
+    'PACCS_RULES_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'agent_rules.json')
+)
+SUPPORTED_VERSIONS = (1,)
+RELOAD_CHECK_INTERVAL = 5.0  # seconds between mtime checks
+
+THEME_LISTS = ('brand_partnership', 'social_impact_audience', 'viral', 'impact_pathway', 'educational_pathway')
+DURATION_PREFS = ('short', 'feature', 'both')
+
+
+class RulesError(ValueError):
+    """The rules file is missing a table or has a malformed entry"""
+
+
+def _require(condition, message):
+    if not condition:
+        raise RulesError(message)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_str_list(value):
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def validate_rules(data):
+    """Check a parsed rules document, raising RulesError on the first problem"""
+    _require(isinstance(data, dict), "rules must be a JSON object")
+    _require(data.get('version') in SUPPORTED_VERSIONS,
+             f"unsupported rules version {data.get('version')!r} (supported: {SUPPORTED_VERSIONS})")
+    for section in ('success_indicators', 'genre_trends', 'distributors', 'festivals', 'theme_lists'):
+        _require(section in data, f"missing section '{section}'")
+    
+    indicators = data['success_indicators']
+    for key in ('strong_countries', 'trending_themes', 'quality_genres'):
+        _require(_is_str_list(indicators.get(key)), f"success_indicators.{key} must be a list of strings")
+    
+    trends = data['genre_trends']
+    _require('General' in trends, "genre_trends must include 'General'")
+    for genre, trend in trends.items():
+        _require(_is_number(trend.get('score')) and _is_number(trend.get('avg_value')),
+                 f"genre_trends.{genre} needs numeric score and avg_value")
+        _require(isinstance(trend.get('trend'), str) and _is_str_list(trend.get('platforms')),
+                 f"genre_trends.{genre} needs a trend and a list of platforms")
+    
+    for category, entries in data['distributors'].items():
+        _require(isinstance(entries, list), f"distributors.{category} must be a list")
+        for i, dist in enumerate(entries):
+            where = f"distributors.{category}[{i}]"
+            _require(isinstance(dist.get('name'), str), f"{where} needs a name")
+            _require(_is_number(dist.get('min_score')), f"{where} needs a numeric min_score")
+            _require(_is_str_list(dist.get('territories')) and _is_str_list(dist.get('focus')),
+                     f"{where} needs territories and focus lists")
+    
+    _require(isinstance(data['festivals'], list), "festivals must be a list")
+    for i, festival in enumerate(data['festivals']):
+        where = f"festivals[{i}]"
+        for key in ('name', 'country'):
+            _require(isinstance(festival.get(key), str), f"{where} needs a {key}")
+        for key in ('tier', 'min_score', 'prestige'):
+            _require(_is_number(festival.get(key)), f"{where} needs a numeric {key}")
+        _require(_is_str_list(festival.get('genres')), f"{where} needs a list of genres")
+        _require(festival.get('duration_pref') in DURATION_PREFS,
+                 f"{where} duration_pref must be one of {', '.join(DURATION_PREFS)}")
+    
+    for name in THEME_LISTS:
+        _require(_is_str_list(data['theme_lists'].get(name)), f"theme_lists.{name} must be a list of strings")
+
+
+class AgentRules:
+    """Validated, compiled rule tables; treat as read-only"""
+    
+    def __init__(self, data, source=None):
+        validate_rules(data)
+        self.version = data['version']
+        self.source = source
+        self.fingerprint = hashlib.sha1(
+            json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        ).hexdigest()
+        self._data = data
+        
+        indicators = data['success_indicators']
+        self.success_indicators = {
+            "optimal_duration": {name: tuple(bounds) for name, bounds in indicators.get('optimal_duration', {}).items()},
+            # Substring-matched against the film's country, so order is kept
+            "strong_countries": tuple(indicators['strong_countries']),
+            "trending_themes": frozenset(indicators['trending_themes']),
+            "quality_genres": frozenset(indicators['quality_genres'])
+        }
+        self.genre_trends = data['genre_trends']
+        self.distributors = data['distributors']
+        self.catalogue = DistributorCatalogue(self.distributors)
+        self.festivals = data['festivals']
+        self.festival_index = FestivalIndex(self.festivals)
+        self.themes = {name: frozenset(data['theme_lists'][name]) for name in THEME_LISTS}
+    
+    @classmethod
+    def from_file(cls, path):
+        """Load and compile a rules file"""
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return cls(data, source=path)
+    
+    def replace(self, **tables):
+        """Copy of these rules with some tables swapped (e.g. festivals=[...])"""
+        data = dict(self._data)
+        data.update(tables)
+        return AgentRules(data, source=self.source)
+
+
+class _RulesRegistry:
+    """Process-wide rules instance with throttled hot reload"""
+    
+    def __init__(self, path=RULES_FILE, check_interval=RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._rules = None
+        self._mtime = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+    
+    def get(self):
+        """Current rules, reloading first if the file changed"""
+        if self._rules is None or time.monotonic() >= self._next_check:
+            self._check()
+        return self._rules
+    
+    def _check(self):
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError as e:
+                if self._rules is None:
+                    raise
+                print(f"Could not check agent rules {self.path}: {e}")
+                return
+            if mtime == self._mtime and self._rules is not None:
+                return
+            
+            try:
+                rules = AgentRules.from_file(self.path)
+            except (OSError, ValueError) as e:
+                if self._rules is None:
+                    raise
+                # A half-edited file must not take the agents down
+                print(f"Keeping previous agent rules; could not reload {self.path}: {e}")
+                self._mtime = mtime
+                return
+            
+            if self._rules is not None:
+                print(f"Reloaded agent rules from {self.path} (version {rules.version})")
+            self._rules = rules
+            self._mtime = mtime
+    
+    def reload(self):
+        """Force a reload check now"""
+        self._next_check = 0.0
+        return self.get()
+
+
+_registry = _RulesRegistry()
+
+
+def get_rules():
+    """Shared rules for this process (hot-reloaded when the file changes)"""
+    return _registry.get()
+
+
+def reload_rules():
+    """Re-check the rules file immediately"""
+    return _registry.reload()
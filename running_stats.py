@@ -0,0 +1,172 @@
+"""
+PACCS Running Statistics
+Decision aggregates maintained incrementally
+- Per-field count, sum and Welford mean/variance, with exact removal so
+  a re-processed film's old decision can be swapped out
+- Category counters (pathway, genre, country)
+- Constant-time statistics, persisted next to the decision log and
+  trusted on restart only if the log is unchanged since they were saved
+"""
+import json
+import math
+import os
+
+from columnar import DECISION_NUMERIC_FIELDS, DECISION_CATEGORICAL_FIELDS
+
+STATS_VERSION = 1
+
+
+class RunningMoments:
+    """Count, sum, mean and variance of a stream that supports removal"""
+    
+    __slots__ = ('count', 'total', 'mean', 'm2')
+    
+    def __init__(self, count=0, total=0.0, mean=0.0, m2=0.0):
+        self.count = count
+        self.total = total
+        self.mean = mean
+        self.m2 = m2
+    
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+    
+    def remove(self, value):
+        """Undo an earlier add(value)"""
+        if self.count <= 1:
+            self.count, self.total, self.mean, self.m2 = 0, 0.0, 0.0, 0.0
+            return
+        old_mean = self.mean
+        self.count -= 1
+        self.total -= value
+        self.mean = (old_mean * (self.count + 1) - value) / self.count
+        self.m2 = max(0.0, self.m2 - (value - self.mean) * (value - old_mean))
+    
+    def variance(self):
+        """Population variance (as numpy's var)"""
+        return self.m2 / self.count if self.count else 0.0
+    
+    def std(self):
+        return math.sqrt(self.variance())
+    
+    def to_dict(self):
+        return {"count": self.count, "total": self.total, "mean": self.mean, "m2": self.m2}
+
+
+class DecisionStats:
+    """Running aggregates over the live consensus decisions"""
+    
+    def __init__(self, numeric_fields=DECISION_NUMERIC_FIELDS, categorical_fields=DECISION_CATEGORICAL_FIELDS):
+        self.numeric_fields = numeric_fields
+        self.categorical_fields = categorical_fields
+        self.count = 0
+        self.moments = {name: RunningMoments() for name in numeric_fields}
+        self.counters = {name: {} for name in categorical_fields}
+    
+    def add(self, decision):
+        """Count a new decision"""
+        self.count += 1
+        for name, extract in self.numeric_fields.items():
+            self.moments[name].add(float(extract(decision)))
+        for name, extract in self.categorical_fields.items():
+            counter = self.counters[name]
+            value = extract(decision)
+            counter[value] = counter.get(value, 0) + 1
+    
+    def remove(self, decision):
+        """Uncount a decision that was added earlier"""
+        self.count -= 1
+        for name, extract in self.numeric_fields.items():
+            self.moments[name].remove(float(extract(decision)))
+        for name, extract in self.categorical_fields.items():
+            counter = self.counters[name]
+            value = extract(decision)
+            # Zero counts stay in place so a category keeps its first-seen slot
+            counter[value] = counter.get(value, 0) - 1
+    
+    def replace(self, old, new):
+        """Swap a film's previous decision for its new one"""
+        self.remove(old)
+        self.add(new)
+    
+    def counts(self, name):
+        """Decisions per category, in first-seen order"""
+        return {value: n for value, n in self.counters[name].items() if n > 0}
+    
+    def mean(self, name):
+        return self.moments[name].mean
+    
+    def total(self, name):
+        return self.moments[name].total
+    
+    def std(self, name):
+        return self.moments[name].std()
+    
+    def to_dict(self):
+        return {
+            "version": STATS_VERSION,
+            "count": self.count,
+            "moments": {name: m.to_dict() for name, m in self.moments.items()},
+            "counters": self.counters
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Restore saved aggregates; raises ValueError if they don't fit"""
+        if data.get("version") != STATS_VERSION:
+            raise ValueError(f"unsupported stats version {data.get('version')!r}")
+        stats = cls()
+        if set(data["moments"]) != set(stats.moments) or set(data["counters"]) != set(stats.counters):
+            raise ValueError("stats fields don't match the decision fields")
+        stats.count = data["count"]
+        stats.moments = {name: RunningMoments(**m) for name, m in data["moments"].items()}
+        stats.counters = {name: dict(counter) for name, counter in data["counters"].items()}
+        return stats
+    
+    def save(self, path, log_path=None):
+        """Write the aggregates atomically, stamped with the log's size and mtime"""
+        data = self.to_dict()
+        data["log"] = _log_stamp(log_path)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path, log_path=None):
+        """Saved aggregates, or None if missing, unreadable or out of date"""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Could not read decision stats {path}: {e}")
+            return None
+        
+        if data.get("log") != _log_stamp(log_path):
+            return None  # The log changed after the stats were saved
+        try:
+            return cls.from_dict(data)
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Ignoring decision stats {path}: {e}")
+            return None
+
+
+def _log_stamp(log_path):
+    """(size, mtime) of the decision log, or None"""
+    if not log_path:
+        return None
+    try:
+        stat = os.stat(log_path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def stats_path(log_path):
+    """Stats file kept next to a decision log (paccs_decisions.stats.json)"""
+    return os.path.splitext(log_path)[0] + ".stats.json"
@@ -4,6 +4,7 @@ Analyzes screenplay PDFs to predict film success BEFORE production
 """
 import random
 from datetime import datetime
+from theme_tagger import KeywordTagger
 
 
 class ScriptAnalysisAgent:
@@ -30,6 +31,10 @@ class ScriptAnalysisAgent:
             "Action": ["explosion", "fight", "gun", "chase", "battle"],
             "Sci-Fi": ["space", "future", "technology", "alien", "robot"]
         }
+        
+        # Compiled single-pass matchers (scripts run to tens of thousands of words)
+        self.genre_tagger = KeywordTagger(self.genre_keywords)
+        self.theme_tagger = KeywordTagger({theme: [theme] for theme in self.trending_themes})
     
     def analyze_script(self, script_text, metadata=None):
         """Analyze a screenplay and return predictions"""
@@ -73,17 +78,14 @@ class ScriptAnalysisAgent:
         # Marketability Score
         market_score = 5.5
         detected_genre = "Drama"
-        genre_matches = {}
-        for genre, keywords in self.genre_keywords.items():
-            matches = sum(1 for kw in keywords if kw in script_lower)
-            genre_matches[genre] = matches
+        genre_matches = self.genre_tagger.count(script_text)
         if genre_matches:
             detected_genre = max(genre_matches, key=genre_matches.get)
         
         if detected_genre in ["Horror", "Thriller", "Sci-Fi"]:
             market_score += 1.5
         
-        themes_found = [t for t in self.trending_themes if t in script_lower]
+        themes_found = self.theme_tagger.tag(script_text)
         market_score += 0.3 * len(themes_found)
         scores["marketability"] = round(min(10.0, market_score + random.uniform(0, 1.5)), 1)
         
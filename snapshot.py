@@ -0,0 +1,77 @@
+"""
+PACCS Binary Snapshots
+Fast-loading marshal copies of the JSON data files
+- Written next to the JSON file whenever it is saved (or first parsed)
+- Loaded in preference to the JSON while the JSON is unchanged
+- Stamped with the JSON's size/mtime and the Python version, so a stale
+  or incompatible snapshot is ignored and regenerated
+"""
+import gc
+import json
+import marshal
+import os
+import sys
+
+SNAPSHOT_VERSION = 1
+
+
+def snapshot_path(json_file):
+    """Snapshot file that shadows a JSON file"""
+    return json_file + ".snapshot"
+
+
+def _header(json_file):
+    """Identity of the JSON file and interpreter the snapshot was built from"""
+    stat = os.stat(json_file)
+    return (SNAPSHOT_VERSION, tuple(sys.version_info[:2]), stat.st_size, stat.st_mtime_ns)
+
+
+def write_snapshot(json_file, data):
+    """Write a snapshot of data for the (already saved) JSON file"""
+    path = snapshot_path(json_file)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(marshal.dumps((_header(json_file), data)))
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(json_file):
+    """Load the snapshot for a JSON file, or None if missing or stale"""
+    try:
+        with open(snapshot_path(json_file), 'rb') as f:
+            blob = f.read()
+        
+        # Building millions of small containers otherwise triggers
+        # repeated, pointless cyclic-GC passes
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            header, data = marshal.loads(blob)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        
+        if header != _header(json_file):
+            return None
+        return data
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def load_json_cached(json_file):
+    """Load a JSON file through its snapshot, regenerating the snapshot if needed
+    
+    Raises FileNotFoundError/ValueError exactly as json.load would.
+    """
+    data = load_snapshot(json_file)
+    if data is not None:
+        return data
+    
+    with open(json_file, 'r') as f:
+        data = json.load(f)
+    try:
+        write_snapshot(json_file, data)
+    except (OSError, ValueError) as e:
+        # Read-only deploys still work, just without the fast path
+        print(f"Could not write snapshot for {json_file}: {e}")
+    return data
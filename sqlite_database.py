@@ -0,0 +1,226 @@
+"""
+PACCS Film Database - SQLite backend
+Same API as FilmDatabase, stored in one shared SQLite file
+- WAL mode so several gunicorn workers can read while one writes
+- Row-level status updates instead of whole-file rewrites
+- Indexed status/genre/country/project_type columns
+- GROUP BY aggregation for statistics
+"""
+import json
+import os
+import sqlite3
+import threading
+
+from columnar import film_columns
+from database import FilmDatabase
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS films (
+    position INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    tracking_number TEXT,
+    title TEXT,
+    status TEXT NOT NULL,
+    genre TEXT NOT NULL,
+    country TEXT NOT NULL,
+    project_type TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_films_status ON films(status);
+CREATE INDEX IF NOT EXISTS idx_films_genre ON films(genre);
+CREATE INDEX IF NOT EXISTS idx_films_country ON films(country);
+CREATE INDEX IF NOT EXISTS idx_films_project_type ON films(project_type);
+CREATE INDEX IF NOT EXISTS idx_films_tracking_number ON films(tracking_number);
+"""
+
+
+class SQLiteFilmDatabase(FilmDatabase):
+    """Manages the film database in SQLite, shared between processes"""
+    
+    def __init__(self, csv_file="FilmFreeway-Submissions-2025-11-25-09-41-21.csv", db_file="films_database.json",
+                 sqlite_file="films_database.sqlite3", write_behind=False, flush_interval=5.0, flush_threshold=100,
+                 import_workers=1):
+        # write_behind/flush_* are accepted for API compatibility; every
+        # status change is already a single-row UPDATE here
+        self.csv_file = csv_file
+        self.db_file = db_file
+        self.sqlite_file = sqlite_file
+        self.import_workers = import_workers
+        self.write_behind = False
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._dirty = set()
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self.load_or_create()
+    
+    def _conn(self):
+        """Get this thread's connection (sqlite3 connections are not thread-safe)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.sqlite_file, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def load_or_create(self):
+        """Create the schema and seed it from the JSON database or the CSV"""
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        
+        count = conn.execute("SELECT COUNT(*) FROM films").fetchone()[0]
+        if count:
+            print(f"Loaded {count} films from {self.sqlite_file}")
+            return
+        
+        if os.path.exists(self.db_file):
+            with open(self.db_file, 'r') as f:
+                films = json.load(f)
+            print(f"Migrating {len(films)} films from {self.db_file} to SQLite...")
+            self.upsert_films(films)
+        else:
+            print("Importing films from FilmFreeway CSV...")
+            self.import_from_csv(workers=self.import_workers)
+        
+        count = conn.execute("SELECT COUNT(*) FROM films").fetchone()[0]
+        print(f"Database initialized with {count} films in {self.sqlite_file}")
+    
+    def import_from_csv(self, workers=1):
+        """Import films from FilmFreeway CSV export into the films table"""
+        self.upsert_films(self.read_csv_films(workers=workers))
+    
+    @staticmethod
+    def _row_values(film):
+        """Column values for a film row"""
+        return (
+            film['id'],
+            film.get('tracking_number'),
+            film.get('title'),
+            film.get('status', 'Unknown'),
+            film.get('genre', 'Unknown'),
+            film.get('country', 'Unknown'),
+            film.get('project_type', 'Unknown'),
+            json.dumps(film),
+        )
+    
+    @staticmethod
+    def _film_from_row(row):
+        """Rebuild a film dict; the status column is authoritative"""
+        status, data = row
+        film = json.loads(data)
+        film['status'] = status
+        return film
+    
+    def upsert_films(self, films):
+        """Insert films, replacing any rows with the same id"""
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT INTO films (id, tracking_number, title, status, genre, country, project_type, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET tracking_number=excluded.tracking_number, title=excluded.title, "
+                "status=excluded.status, genre=excluded.genre, country=excluded.country, "
+                "project_type=excluded.project_type, data=excluded.data",
+                [self._row_values(film) for film in films]
+            )
+    
+    def _query_films(self, where="", params=()):
+        """Run a film SELECT, returning film dicts in database order"""
+        rows = self._conn().execute(
+            f"SELECT status, data FROM films {where} ORDER BY position", params
+        )
+        return [self._film_from_row(row) for row in rows]
+    
+    @property
+    def films(self):
+        """All films (loads every row; prefer the query methods)"""
+        return self._query_films()
+    
+    def save(self):
+        """Export the database to the JSON file"""
+        with open(self.db_file + ".tmp", 'w') as f:
+            json.dump(self.films, f, indent=2)
+        os.replace(self.db_file + ".tmp", self.db_file)
+    
+    def flush(self):
+        """Nothing to flush; updates are committed as they happen"""
+    
+    def rebuild_indexes(self):
+        """SQLite maintains its own indexes"""
+    
+    def _index_film(self, film):
+        """SQLite maintains its own indexes"""
+    
+    def _unindex_film(self, film):
+        """SQLite maintains its own indexes"""
+    
+    def _set_field(self, film, field, value):
+        """Change a field on a film and write its row"""
+        film[field] = value
+        self.upsert_films([film])
+    
+    def _mark_dirty(self, *film_ids):
+        """Nothing to schedule; every write is committed as it happens"""
+    
+    def get_film(self, film_id):
+        """Get a specific film by ID"""
+        films = self._query_films("WHERE id = ?", (film_id,))
+        return films[0] if films else None
+    
+    def _check_field(self, field):
+        """Only indexed columns may be interpolated into SQL"""
+        if field not in self.INDEXED_FIELDS:
+            raise ValueError(f"{field} is not an indexed field (use one of {', '.join(self.INDEXED_FIELDS)})")
+    
+    def get_films_by(self, field, value):
+        """Get all films whose indexed field equals value"""
+        self._check_field(field)
+        return self._query_films(f"WHERE {field} = ?", (value,))
+    
+    def count_films_by(self, field):
+        """Count films per value of an indexed field"""
+        self._check_field(field)
+        rows = self._conn().execute(f"SELECT {field}, COUNT(*) FROM films GROUP BY {field}")
+        return dict(rows.fetchall())
+    
+    def find_films(self, **criteria):
+        """Get films matching every indexed field=value criterion"""
+        if not criteria:
+            return self.films
+        for field in criteria:
+            self._check_field(field)
+        where = "WHERE " + " AND ".join(f"{field} = ?" for field in criteria)
+        return self._query_films(where, tuple(criteria.values()))
+    
+    def update_film_status(self, film_id, status):
+        """Update a film's status"""
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute("UPDATE films SET status = ? WHERE id = ?", (status, film_id))
+        return cursor.rowcount > 0
+    
+    def _film_columns(self):
+        """Columnar view of the films, read fresh since other processes may write"""
+        return film_columns(self.films)
+    
+    def get_statistics(self):
+        """Get database statistics"""
+        conn = self._conn()
+        total = conn.execute("SELECT COUNT(*) FROM films").fetchone()[0]
+        status_counts = self.count_films_by('status')
+        genres = self.count_films_by('genre')
+        countries = self.count_films_by('country')
+        top_countries = conn.execute(
+            "SELECT country, COUNT(*) AS n FROM films GROUP BY country ORDER BY n DESC LIMIT 10"
+        ).fetchall()
+        
+        return {
+            "total_films": total,
+            "pending": status_counts.get('pending', 0),
+            "reviewed": status_counts.get('reviewed', 0),
+            "genres": genres,
+            "countries": countries,
+            "top_countries": top_countries
+        }
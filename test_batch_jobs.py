@@ -0,0 +1,90 @@
+"""
+PACCS Batch Jobs tests
+- A job interrupted mid-chunk resumes without redoing or skipping films
+"""
+import csv
+
+import pytest
+
+from batch_jobs import BatchJob, run_job
+from consensus import ConsensusProtocol
+from database import FilmDatabase
+from decision_store import DecisionStore
+
+HEADER = ["Project Title", "Tracking Number", "Genres", "Duration", "Country of Origin", "Synopsis"]
+
+
+class Interrupted(Exception):
+    pass
+
+
+def open_database(tmp_path):
+    csv_file = tmp_path / "export.csv"
+    if not csv_file.exists():
+        with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADER)
+            writer.writerows([f"Film {n}", f"T-{n}", "Drama", "00:12:00", "UK", f"Synopsis {n}."]
+                             for n in range(1, 7))
+    return FilmDatabase(csv_file=str(csv_file), db_file=str(tmp_path / "films.json"))
+
+
+def open_consensus(tmp_path):
+    store = DecisionStore(path=str(tmp_path / "decisions.jsonl"), legacy_file=None)
+    return ConsensusProtocol(verbose=False, store=store)
+
+
+def record_calls(consensus, fail_on=None):
+    """Film ids passed to consensus.process_film; call fail_on raises Interrupted"""
+    calls = []
+    process_film = consensus.process_film
+    def wrapper(film, **kwargs):
+        calls.append(film['id'])
+        if len(calls) == fail_on:
+            raise Interrupted()
+        return process_film(film, **kwargs)
+    consensus.process_film = wrapper
+    return calls
+
+
+def test_resume_after_interruption(tmp_path):
+    db = open_database(tmp_path)
+    film_ids = [film['id'] for film in db.films]
+    job = BatchJob(film_ids, directory=str(tmp_path / "jobs"), checkpoint_every=2)
+    consensus = open_consensus(tmp_path)
+    # Film 3 is decided, film 4 fails: the second chunk is never checkpointed
+    record_calls(consensus, fail_on=4)
+    with pytest.raises(Interrupted):
+        run_job(job, consensus, db)
+    
+    saved = BatchJob.load(job.job_id, directory=str(tmp_path / "jobs"))
+    assert saved.status == "running"
+    assert saved.completed == film_ids[:2]
+    
+    db = open_database(tmp_path)
+    consensus = open_consensus(tmp_path)
+    calls = record_calls(consensus)
+    resumed = run_job(saved, consensus, db)
+    
+    assert calls == film_ids[3:]
+    assert resumed.status == "completed"
+    assert resumed.skipped == film_ids[2:3]
+    assert sorted(resumed.completed + resumed.skipped) == film_ids
+    assert [film['status'] for film in open_database(tmp_path).films] == ["reviewed"] * 6
+    store = DecisionStore(path=str(tmp_path / "decisions.jsonl"), legacy_file=None)
+    assert sorted(d['film_id'] for d in store.load()) == film_ids
+    assert store.total_records == 6
+
+
+def test_completed_job_has_nothing_left(tmp_path):
+    db = open_database(tmp_path)
+    job = BatchJob([film['id'] for film in db.films] + ["FILM_9999"], directory=str(tmp_path / "jobs"),
+                   checkpoint_every=4)
+    run_job(job, open_consensus(tmp_path), db)
+    
+    consensus = open_consensus(tmp_path)
+    calls = record_calls(consensus)
+    job = run_job(BatchJob.load(job.job_id, directory=str(tmp_path / "jobs")), consensus, db)
+    assert calls == []
+    assert job.failed == {"FILM_9999": "film not found"}
+    assert job.progress()['remaining'] == 1
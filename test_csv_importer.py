@@ -0,0 +1,93 @@
+"""
+PACCS FilmFreeway Importer tests
+- An interrupted import resumes without duplicating or skipping rows
+"""
+import csv
+
+import pytest
+
+from csv_importer import FilmFreewayImporter
+from database import FilmDatabase
+
+HEADER = ["Project Title", "Tracking Number", "Genres", "Duration", "Country of Origin", "Synopsis"]
+ROWS = [[f"Film {n}", f"T-{n}", "Drama", "00:12:00", "UK", f"Synopsis {n}."] for n in range(1, 6)]
+
+
+class Interrupted(Exception):
+    pass
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+
+def empty_database(tmp_path):
+    write_csv(tmp_path / "empty.csv", [])
+    return FilmDatabase(csv_file=str(tmp_path / "empty.csv"), db_file=str(tmp_path / "films.json"))
+
+
+def importer_for(db, tmp_path):
+    csv_file = tmp_path / "export.csv"
+    if not csv_file.exists():
+        write_csv(csv_file, ROWS)
+    return FilmFreewayImporter(db, csv_file=str(csv_file), chunk_size=2,
+                               checkpoint_file=str(tmp_path / "import-checkpoint.json"))
+
+
+def fail_on_call(func, call_number):
+    """Wrap func so its call_number-th call raises Interrupted"""
+    calls = []
+    def wrapper(*args, **kwargs):
+        calls.append(None)
+        if len(calls) == call_number:
+            raise Interrupted()
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def assert_imported_once(db):
+    assert sorted(film['tracking_number'] for film in db.films) == [f"T-{n}" for n in range(1, 6)]
+    assert len({film['id'] for film in db.films}) == 5
+
+
+def test_resume_after_failed_chunk(tmp_path):
+    db = empty_database(tmp_path)
+    importer = importer_for(db, tmp_path)
+    importer.db.upsert_films = fail_on_call(db.upsert_films, 2)
+    with pytest.raises(Interrupted):
+        importer.run()
+    assert len(db.films) == 2
+    
+    counts = importer_for(db, tmp_path).run()
+    assert_imported_once(db)
+    assert counts == {"added": 5, "updated": 0, "unchanged": 0, "skipped": 0}
+
+
+def test_resume_after_chunk_written_but_not_checkpointed(tmp_path):
+    db = empty_database(tmp_path)
+    importer = importer_for(db, tmp_path)
+    importer.save_checkpoint = fail_on_call(importer.save_checkpoint, 2)
+    with pytest.raises(Interrupted):
+        importer.run()
+    assert len(db.films) == 4
+    
+    # The second chunk is read again but finds its films already imported
+    counts = importer_for(db, tmp_path).run()
+    assert_imported_once(db)
+    assert counts == {"added": 3, "updated": 0, "unchanged": 2, "skipped": 0}
+    assert not (tmp_path / "import-checkpoint.json").exists()
+
+
+def test_reimport_keeps_status_of_known_films(tmp_path):
+    db = empty_database(tmp_path)
+    importer_for(db, tmp_path).run()
+    db.update_film_status("FILM_0001", "reviewed")
+    
+    write_csv(tmp_path / "export.csv", [["Film 1", "T-1", "Drama", "00:15:00", "UK", "New cut."]] + ROWS[1:])
+    counts = importer_for(db, tmp_path).run()
+    assert counts == {"added": 0, "updated": 1, "unchanged": 4, "skipped": 0}
+    assert db.get_film("FILM_0001")['status'] == "reviewed"
+    assert db.get_film("FILM_0001")['synopsis'] == "New cut."
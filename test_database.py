@@ -0,0 +1,38 @@
+"""
+PACCS Film Database tests
+- FilmFreeway exports with stray trailing commas give ragged rows
+"""
+import csv
+import hashlib
+import json
+
+from database import FilmDatabase
+
+HEADER = ["Project Title", "Tracking Number", "Genres", "Duration", "Country of Origin", "Synopsis"]
+
+
+def write_ragged_csv(path):
+    """Two films, the second with one field more than the header"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerow(["First Film", "T-1", "Drama", "00:12:00", "UK", "A quiet drama."])
+        writer.writerow(["Second Film", "T-2", "Documentary", "01:30:00", "France", "A documentary.", ""])
+
+
+def test_row_hash_accepts_ragged_row():
+    row = {"Project Title": "Film", None: ["", "x"]}
+    assert FilmDatabase.row_hash(row) != FilmDatabase.row_hash({"Project Title": "Film"})
+
+
+def test_row_hash_unchanged_for_regular_rows():
+    row = {"Project Title": "Film", "Country of Origin": "UK"}
+    expected = hashlib.sha1(json.dumps(row, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+    assert FilmDatabase.row_hash(row) == expected
+
+
+def test_import_with_ragged_row(tmp_path):
+    csv_file = tmp_path / "submissions.csv"
+    write_ragged_csv(csv_file)
+    db = FilmDatabase(csv_file=str(csv_file), db_file=str(tmp_path / "films.json"))
+    assert [film['title'] for film in db.films] == ["First Film", "Second Film"]
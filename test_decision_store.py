@@ -0,0 +1,66 @@
+"""
+PACCS Decision Store tests
+- Latest decision per film wins, in first-seen order
+- Legacy JSON import and compaction
+"""
+import json
+
+from decision_store import DecisionStore
+
+
+def decision(film_id, pathway, score=5.0):
+    return {"film_id": film_id, "pathway": pathway, "final_score": score, "report": object()}
+
+
+def open_store(tmp_path, **kwargs):
+    return DecisionStore(path=str(tmp_path / "decisions.jsonl"), legacy_file=str(tmp_path / "legacy.json"), **kwargs)
+
+
+def test_reload_keeps_latest_decision_per_film(tmp_path):
+    store = open_store(tmp_path)
+    store.append_many([decision("FILM_0001", "FESTIVAL"), decision("FILM_0002", "STREAMING")])
+    store.append(decision("FILM_0001", "EDUCATIONAL", 7.5))
+    
+    reloaded = open_store(tmp_path)
+    live = reloaded.load()
+    assert [(d['film_id'], d['pathway']) for d in live] == [("FILM_0001", "EDUCATIONAL"), ("FILM_0002", "STREAMING")]
+    assert 'report' not in live[0]
+    assert reloaded.total_records == 3
+    assert len(reloaded) == 2
+    assert reloaded.get("FILM_0001")['final_score'] == 7.5
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    with open(tmp_path / "legacy.json", 'w') as f:
+        json.dump([{"film_id": "FILM_0001", "pathway": "FESTIVAL"},
+                   {"film_id": "FILM_0002", "pathway": "STREAMING"}], f)
+    store = open_store(tmp_path)
+    assert [d['film_id'] for d in store.load()] == ["FILM_0001", "FILM_0002"]
+    
+    store.append({"film_id": "FILM_0003", "pathway": "FESTIVAL"})
+    # The log exists now, so the legacy file is not imported again
+    assert [d['film_id'] for d in open_store(tmp_path).load()] == ["FILM_0001", "FILM_0002", "FILM_0003"]
+
+
+def test_compaction_keeps_exactly_the_live_decisions(tmp_path):
+    store = open_store(tmp_path, compact_min_records=10**6)
+    for round_number in range(3):
+        store.append_many([decision(f"FILM_{n:04d}", "FESTIVAL", round_number) for n in range(4)])
+    store.append({"pathway": "STREAMING"})  # no film id: never superseded
+    before = list(store.iter_live())
+    
+    store.compact()
+    with open(store.path, 'rb') as f:
+        assert sum(1 for _ in f) == 5
+    assert store.total_records == len(store) == 5
+    assert list(store.iter_live()) == before == open_store(tmp_path).load()
+    assert all(d['final_score'] == 2 for d in before if 'film_id' in d)
+
+
+def test_append_compacts_once_mostly_superseded(tmp_path):
+    store = open_store(tmp_path, compact_ratio=0.5, compact_min_records=6)
+    for round_number in range(3):
+        store.append_many([decision("FILM_0001", "FESTIVAL", round_number),
+                           decision("FILM_0002", "FESTIVAL", round_number)])
+    assert store.total_records == 2
+    assert [d['final_score'] for d in open_store(tmp_path).load()] == [2, 2]
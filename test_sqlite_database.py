@@ -0,0 +1,47 @@
+"""
+PACCS Film Database tests - SQLite backend
+- CSV imports go through the films table
+"""
+import csv
+
+from sqlite_database import SQLiteFilmDatabase
+
+HEADER = ["Project Title", "Tracking Number", "Genres", "Duration", "Country of Origin", "Synopsis"]
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+
+def open_sqlite(tmp_path, csv_file):
+    return SQLiteFilmDatabase(csv_file=str(csv_file), db_file=str(tmp_path / "films.json"),
+                              sqlite_file=str(tmp_path / "films.sqlite3"))
+
+
+def test_csv_import_fills_the_table(tmp_path):
+    csv_file = tmp_path / "submissions.csv"
+    write_csv(csv_file, [["First Film", "T-1", "Drama", "00:12:00", "UK", "A quiet drama."],
+                         ["Second Film", "T-2", "Documentary", "01:30:00", "France", "A documentary."]])
+    db = open_sqlite(tmp_path, csv_file)
+    
+    assert [film['title'] for film in db.films] == ["First Film", "Second Film"]
+    assert db.count_films_by('status') == {'pending': 2}
+    assert db.get_films_by('country', 'France')[0]['title'] == "Second Film"
+
+
+def test_reimport_upserts_by_id(tmp_path):
+    csv_file = tmp_path / "submissions.csv"
+    write_csv(csv_file, [["First Film", "T-1", "Drama", "00:12:00", "UK", "A quiet drama."]])
+    db = open_sqlite(tmp_path, csv_file)
+    
+    write_csv(csv_file, [["First Film", "T-1", "Drama", "00:14:00", "UK", "A longer cut."],
+                         ["Second Film", "T-2", "Documentary", "01:30:00", "France", "A documentary."]])
+    db.import_from_csv()
+    
+    films = db.films
+    assert [film['id'] for film in films] == ["FILM_0001", "FILM_0002"]
+    assert films[0]['synopsis'] == "A longer cut."
+    assert open_sqlite(tmp_path, csv_file).get_statistics()['total_films'] == 2
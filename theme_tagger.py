@@ -0,0 +1,87 @@
+"""
+PACCS Keyword Tagger
+Single-pass multi-keyword matching for themes, genres and content flags
+- All keywords compiled into one alternation regex
+- Word-boundary aware ("ai" no longer matches inside "said")
+- Batch API tags many texts with one scan
+"""
+import re
+from bisect import bisect_right
+
+
+class KeywordTagger:
+    """Tags text with labels from a {label: [keywords]} table in one pass
+    
+    Keywords ending in a short word (3 letters or fewer) must match whole
+    words, allowing a plural "s"; longer keywords match at the start of a
+    word so that "parent" still finds "parents" and "learn" finds
+    "learning".
+    """
+    
+    SHORT_KEYWORD = 3
+    
+    def __init__(self, keyword_table):
+        self.labels = list(keyword_table)
+        self._keyword_labels = {}
+        for label, keywords in keyword_table.items():
+            for keyword in keywords:
+                self._keyword_labels.setdefault(keyword.lower(), []).append(label)
+        
+        self._keywords = list(self._keyword_labels)
+        # Longest first so the longer phrase wins where two start together
+        order = sorted(range(len(self._keywords)), key=lambda i: -len(self._keywords[i]))
+        alternation = "|".join(f"(?P<k{i}>{self._keyword_pattern(self._keywords[i])})" for i in order)
+        self._regex = re.compile(alternation) if alternation else None
+    
+    def _keyword_pattern(self, keyword):
+        """Regex for one keyword"""
+        escaped = re.escape(keyword)
+        if len(keyword.split()[-1]) <= self.SHORT_KEYWORD:
+            return rf"\b{escaped}s?\b"
+        return rf"\b{escaped}\w*"
+    
+    def _iter_keywords(self, text):
+        """Yield (position, keyword) for every match in already-lowercased text"""
+        if self._regex is None:
+            return
+        for m in self._regex.finditer(text):
+            yield m.start(), self._keywords[int(m.lastgroup[1:])]
+    
+    def match(self, text):
+        """Set of keywords found in text"""
+        return {keyword for _, keyword in self._iter_keywords(text.lower())}
+    
+    def _labels_for(self, keywords):
+        """Labels hit by a set of keywords, in table order"""
+        hit = set()
+        for keyword in keywords:
+            hit.update(self._keyword_labels[keyword])
+        return [label for label in self.labels if label in hit]
+    
+    def tag(self, text):
+        """Labels whose keywords appear in text, in table order"""
+        return self._labels_for(self.match(text))
+    
+    def count(self, text):
+        """Number of distinct keywords found per label"""
+        counts = {label: 0 for label in self.labels}
+        for keyword in self.match(text):
+            for label in self._keyword_labels[keyword]:
+                counts[label] += 1
+        return counts
+    
+    def tag_batch(self, texts):
+        """Tag a list of texts with a single scan over all of them"""
+        texts = [text.lower() for text in texts]
+        starts = []
+        pos = 0
+        for text in texts:
+            starts.append(pos)
+            pos += len(text) + 1
+        
+        # Newlines keep keywords from running across document boundaries
+        joined = "\n".join(texts)
+        found = [set() for _ in texts]
+        for position, keyword in self._iter_keywords(joined):
+            found[bisect_right(starts, position) - 1].add(keyword)
+        return [self._labels_for(keywords) for keywords in found]